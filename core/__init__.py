@@ -0,0 +1,25 @@
+from .breaker import CircuitBreaker, CircuitOpen
+from .cache import ResultCache
+from .engine import FetchEngine
+from .executor import BoundedExecutor, Bulkhead, BulkheadFull
+from .latency import LatencyHistogram, TimeoutTuner
+from .parsepool import ParsePool
+from .search import SearchPipeline
+from .singleflight import SingleFlight
+from .store import SQLiteStore
+
+__all__ = [
+    "FetchEngine",
+    "BoundedExecutor",
+    "Bulkhead",
+    "BulkheadFull",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "LatencyHistogram",
+    "ParsePool",
+    "ResultCache",
+    "SearchPipeline",
+    "SingleFlight",
+    "SQLiteStore",
+    "TimeoutTuner",
+]
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Sliding-window circuit breaker for one upstream source.
+
+    The breaker opens when, over the last ``window`` seconds and at least
+    ``min_calls`` calls, the failure rate or the slow-call rate crosses its
+    threshold. After ``open_for`` seconds it goes half-open and lets up to
+    ``probes`` calls through: one failure re-opens it, ``probes`` successes
+    close it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 60.0,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call: float = 10.0,
+        slow_rate: float = 0.8,
+        open_for: float = 30.0,
+        probes: int = 2,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.open_for = open_for
+        self.probes = probes
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._calls = deque()
+        self._probing = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Admit a call or raise CircuitOpen; returns True for half-open probes."""
+        with self._lock:
+            return self._allow()
+
+    def _allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_for:
+                self.rejected += 1
+                raise CircuitOpen(f"{self.name} is temporarily unavailable")
+            self.state = self.HALF_OPEN
+            self._probing = 0
+            self._probe_successes = 0
+
+        if self.state == self.HALF_OPEN:
+            if self._probing >= self.probes:
+                self.rejected += 1
+                raise CircuitOpen(f"{self.name} is temporarily unavailable")
+            self._probing += 1
+            return True
+        return False
+
+    def record(self, failed: bool, duration: float, probe: bool = False):
+        with self._lock:
+            self._record(failed, duration, probe)
+
+    def release(self, probe: bool):
+        """Forget an admitted call that was cancelled before it had an outcome."""
+        with self._lock:
+            if probe and self.state == self.HALF_OPEN:
+                self._probing -= 1
+
+    def _record(self, failed: bool, duration: float, probe: bool):
+        now = time.monotonic()
+        slow = duration >= self.slow_call
+
+        if probe:
+            if self.state != self.HALF_OPEN:
+                return
+            self._probing -= 1
+            if failed or slow:
+                self._open(now)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self.state = self.CLOSED
+                    self._calls.clear()
+            return
+        if self.state != self.CLOSED:
+            return
+
+        self._calls.append((now, failed, slow))
+        self._trim(now)
+        if len(self._calls) >= self.min_calls:
+            failures = sum(1 for _, f, _ in self._calls if f)
+            slows = sum(1 for _, _, s in self._calls if s)
+            if (
+                failures / len(self._calls) >= self.failure_rate
+                or slows / len(self._calls) >= self.slow_rate
+            ):
+                self._open(now)
+
+    def _open(self, now: float):
+        self.state = self.OPEN
+        self.opened_at = now
+        self._calls.clear()
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "state": self.state,
+                "calls": len(self._calls),
+                "failures": sum(1 for _, f, _ in self._calls if f),
+                "slow": sum(1 for _, _, s in self._calls if s),
+                "rejected": self.rejected,
+            }
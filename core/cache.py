@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical(identifier: str) -> str:
+    return identifier.strip().lower()
+
+
+_NOT_FOUND = "$not_found"
+
+
+class CachedNotFound(ValueError):
+    """Raised for a "not found" answer served from the cache."""
+
+    outcome = "not_found"
+
+
+def not_found_message(value) -> str | None:
+    """The message of a value stored by ``put_not_found``, else None."""
+    if isinstance(value, dict) and len(value) == 1 and _NOT_FOUND in value:
+        return value[_NOT_FOUND]
+    return None
+
+
+def _sizeof(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class ResultCache:
+    """Per-source result cache with TTLs and LRU eviction bounded by bytes.
+
+    With a ``store`` (see SQLiteStore) the in-memory cache is the first
+    level: misses fall through to the store, and puts are written to both.
+    Expired entries are kept for another ``stale_ttl`` seconds, during
+    which ``lookup`` still returns them flagged as stale. "Not found"
+    answers are cached for ``not_found_ttl`` seconds (see ``put_not_found``).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300,
+        ttls: dict | None = None,
+        store=None,
+        stale_ttl: float = 0,
+        not_found_ttl: float = 0,
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.store = store
+        self.stale_ttl = stale_ttl
+        self.not_found_ttl = not_found_ttl
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, label: str) -> float:
+        return self.ttls.get(label, self.default_ttl)
+
+    def _count(self, label: str, field: str):
+        stats = self._stats.setdefault(
+            label, {"hits": 0, "store_hits": 0, "stale_hits": 0, "misses": 0},
+        )
+        stats[field] += 1
+
+    def get(self, label: str, identifier: str):
+        found = self.lookup(label, identifier, stale=False)
+        return found[0] if found is not None else None
+
+    def lookup(self, label: str, identifier: str, stale: bool = True):
+        """Return ``(value, age, is_stale)`` or None.
+
+        Without ``stale`` only entries within their TTL are returned.
+        This may read the store; on the event loop use ``lookup_async``.
+        """
+        key = (label, canonical(identifier))
+        stale_for = self.stale_ttl if stale else 0
+        found = self._from_memory(key, stale_for)
+        if found is None and self.store is not None:
+            found = self._from_store(key, stale_for)
+        if found is None:
+            with self._lock:
+                self._count(label, "misses")
+        return found
+
+    async def lookup_async(self, label: str, identifier: str, stale: bool = True):
+        """``lookup`` with the store read (SQLite, zlib, JSON) run on the
+        loop's default executor."""
+        key = (label, canonical(identifier))
+        stale_for = self.stale_ttl if stale else 0
+        found = self._from_memory(key, stale_for)
+        if found is None and self.store is not None:
+            loop = asyncio.get_running_loop()
+            found = await loop.run_in_executor(None, self._from_store, key, stale_for)
+        if found is None:
+            with self._lock:
+                self._count(label, "misses")
+        return found
+
+    def _from_memory(self, key, stale_for: float):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] + self.stale_ttl <= now:
+                self._remove(key)
+                entry = None
+            if entry is not None and entry[2] + stale_for > now:
+                self._entries.move_to_end(key)
+                is_stale = entry[2] <= now
+                self._count(key[0], "stale_hits" if is_stale else "hits")
+                return entry[0], now - entry[3], is_stale
+        return None
+
+    def _from_store(self, key, stale_for: float):
+        stored = self.store.get(*key, stale_for=stale_for)
+        if stored is None or stored[0] is None:
+            return None
+        value, ttl, age = stored
+        self._insert(key, value, ttl, age)
+        with self._lock:
+            self._count(key[0], "stale_hits" if ttl <= 0 else "store_hits")
+        return value, age, ttl <= 0
+
+    def put(self, label: str, identifier: str, value, ttl: float | None = None):
+        if ttl is None:
+            ttl = self.ttl_for(label)
+        if value is None or ttl <= 0:
+            return
+        key = (label, canonical(identifier))
+        self._insert(key, value, ttl)
+        if self.store is not None:
+            self.store.put(*key, value, ttl)
+
+    async def put_async(self, label: str, identifier: str, value, ttl: float | None = None):
+        """``put`` run on the loop's default executor: sizing a value means
+        JSON-encoding it, which is too slow for the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.put, label, identifier, value, ttl)
+
+    def put_not_found(self, label: str, identifier: str, message: str):
+        self.put(label, identifier, {_NOT_FOUND: message}, self.not_found_ttl)
+
+    def _insert(self, key, value, ttl: float, age: float = 0):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, now + ttl, now - age)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        size = self._entries.pop(key)[1]
+        self.bytes -= size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits = sum(s["hits"] for s in self._stats.values())
+            store_hits = sum(s["store_hits"] for s in self._stats.values())
+            stale_hits = sum(s["stale_hits"] for s in self._stats.values())
+            misses = sum(s["misses"] for s in self._stats.values())
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "hits": hits,
+                "store_hits": store_hits,
+                "stale_hits": stale_hits,
+                "misses": misses,
+                "sources": {
+                    label: dict(stats)
+                    for label, stats in sorted(self._stats.items())
+                },
+            }
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import queue
+import threading
+
+from .executor import BoundedExecutor
+from .parsepool import ParsePool
+
+
+_END = object()
+
+
+class FetchEngine:
+    """One asyncio loop per worker process that drives every source fetch.
+
+    Clients may expose an ``async get_profile_async``, which runs on the
+    loop itself and is bounded only by its source's bulkhead; blocking
+    clients are run on the shared bounded executor instead. With a
+    parse pool, clients that split ``get_profile`` into ``fetch_page`` and
+    ``parse_page`` only download on the executor and parse in a worker
+    process.
+    """
+
+    def __init__(self, executor: BoundedExecutor | None = None, parsers: ParsePool | None = None):
+        self.executor = executor or BoundedExecutor()
+        self.parsers = parsers
+        self.loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Started lazily so that gunicorn workers forked after import each
+        # get their own loop thread.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run, name="fetch-engine", daemon=True,
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def call(self, label: str, fn, *args, on_start=None):
+        return await self.executor.run(label, fn, *args, on_start=on_start)
+
+    async def fetch(self, label: str, client, *args, on_start=None):
+        """Fetch one profile; ``on_start`` fires once the source has a slot
+        and the upstream request is about to be made."""
+        fn = getattr(client, "get_profile_async", None)
+        if fn is not None:
+            async with self.executor.slot(label, on_start, thread=False):
+                return await fn(*args)
+        if self.parsers is not None and hasattr(client, "parse_page"):
+            def start():
+                # Rejected before the download rather than after it.
+                self.parsers.check()
+                if on_start is not None:
+                    on_start()
+
+            page = await self.call(label, client.fetch_page, *args, on_start=start)
+            return await self.parsers.run(label, client, *page)
+        return await self.call(label, client.get_profile, *args, on_start=on_start)
+
+    def submit(self, coro):
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stream(self, agen, heartbeat: float | None = None):
+        """Run an async generator on the engine loop, yielding its items here.
+
+        With ``heartbeat``, None is yielded whenever that many seconds pass
+        without an item, so the caller gets a chance to write and notice a
+        closed connection. Closing this generator cancels ``agen``.
+        """
+        results = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    results.put((item, None))
+            except Exception as exc:
+                results.put((None, exc))
+            finally:
+                results.put((_END, None))
+
+        future = self.submit(pump())
+        try:
+            while True:
+                try:
+                    item, exc = results.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield None
+                    continue
+                if exc is not None:
+                    raise exc
+                if item is _END:
+                    break
+                yield item
+        finally:
+            future.cancel()
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from .metrics import SOURCE_CPU
+
+
+class BulkheadFull(Exception):
+    pass
+
+
+class Bulkhead:
+
+    def __init__(self, name: str, limit: int, max_queue: int | None = None):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._sem = None
+        self._sem_loop = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.limit)
+            self._sem_loop = loop
+        return self._sem
+
+    def check(self):
+        """Raise BulkheadFull if an ``acquire`` now would be rejected."""
+        sem = self._semaphore()
+        if sem.locked() and self.max_queue is not None and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise BulkheadFull(f"{self.name} is over capacity, try again shortly")
+
+    async def acquire(self, reject: bool = True):
+        """Wait for a slot; with ``reject``, fail fast once the queue is full."""
+        sem = self._semaphore()
+        if reject:
+            self.check()
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await sem.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - start
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self.completed += 1
+        self._sem.release()
+
+    def snapshot(self) -> dict:
+        acquired = self.completed + self.active
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / acquired * 1000, 2) if acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+class BoundedExecutor:
+    """Process-wide thread pool with a global cap and per-source bulkheads.
+
+    A call first waits for a slot in its source's bulkhead and only then for
+    a global slot, so a degraded source queues behind its own limit instead
+    of holding pool threads that other sources need.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 64,
+        limits: dict | None = None,
+        default_limit: int = 16,
+        max_queue: int | None = 64,
+    ):
+        self.max_workers = max_workers
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self._global = Bulkhead("global", max_workers)
+        self._bulkheads = {}
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def bulkhead(self, label: str) -> Bulkhead:
+        bulkhead = self._bulkheads.get(label)
+        if bulkhead is None:
+            bulkhead = Bulkhead(
+                label,
+                self.limits.get(label, self.default_limit),
+                self.max_queue,
+            )
+            self._bulkheads[label] = bulkhead
+        return bulkhead
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="fetch",
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    @asynccontextmanager
+    async def slot(self, label: str, on_start=None, thread: bool = True):
+        """Hold the source's bulkhead and, for work that runs on the pool
+        (``thread``), a global slot."""
+        bulkhead = self.bulkhead(label)
+        await bulkhead.acquire()
+        try:
+            if thread:
+                await self._global.acquire()
+            try:
+                if on_start is not None:
+                    on_start()
+                yield
+            finally:
+                if thread:
+                    self._global.release()
+        finally:
+            bulkhead.release()
+
+    async def run(self, label: str, fn, *args, on_start=None):
+        async with self.slot(label, on_start):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_pool(), _timed, label, fn, *args,
+            )
+
+    def snapshot(self) -> dict:
+        return {
+            "global": self._global.snapshot(),
+            "sources": {
+                label: bulkhead.snapshot()
+                for label, bulkhead in sorted(self._bulkheads.items())
+            },
+        }
+
+
+def _timed(label: str, fn, *args):
+    start = time.thread_time()
+    try:
+        return fn(*args)
+    finally:
+        SOURCE_CPU.labels(label).inc(time.thread_time() - start)
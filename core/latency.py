@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Rolling latency histogram made of fixed-width time slots.
+
+    Observations land in the current slot; slots older than
+    ``slots * slot_seconds`` fall out of every quantile.
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 8, 12, 20, 30, 60)
+
+    def __init__(self, slots: int = 10, slot_seconds: float = 30.0):
+        self.slots = slots
+        self.slot_seconds = slot_seconds
+        self._counts = [[0] * (len(self.BUCKETS) + 1) for _ in range(slots)]
+        self._epochs = [-1] * slots
+        self._lock = threading.Lock()
+
+    def _slot(self, now: float) -> list:
+        epoch = int(now // self.slot_seconds)
+        index = epoch % self.slots
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._counts[index] = [0] * (len(self.BUCKETS) + 1)
+        return self._counts[index]
+
+    def observe(self, seconds: float):
+        with self._lock:
+            counts = self._slot(time.monotonic())
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+
+    def _merged(self) -> list:
+        oldest = int(time.monotonic() // self.slot_seconds) - self.slots + 1
+        merged = [0] * (len(self.BUCKETS) + 1)
+        for epoch, counts in zip(self._epochs, self._counts):
+            if epoch >= oldest:
+                for i, n in enumerate(counts):
+                    merged[i] += n
+        return merged
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(self._merged())
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile, if any data."""
+        with self._lock:
+            merged = self._merged()
+        total = sum(merged)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(merged):
+            seen += n
+            if seen >= rank:
+                return self.BUCKETS[i] if i < len(self.BUCKETS) else math.inf
+        return math.inf
+
+
+class TimeoutTuner:
+    """Derives each source's request timeout from its observed latency.
+
+    The effective timeout is ``p99 * factor`` rounded up to whole seconds and
+    clamped between ``minimum`` and the client's configured timeout. Until a
+    source has ``min_samples`` observations its configured timeout is used.
+    """
+
+    def __init__(
+        self,
+        factor: float = 3.0,
+        minimum: int = 2,
+        min_samples: int = 20,
+        quantile: float = 0.99,
+    ):
+        self.factor = factor
+        self.minimum = minimum
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.histograms = {}
+        self._defaults = {}
+
+    def register(self, label: str, client):
+        self._defaults[label] = getattr(client, "timeout", None)
+        self.histograms[label] = LatencyHistogram()
+
+    def observe(self, label: str, seconds: float):
+        histogram = self.histograms.get(label)
+        if histogram is not None:
+            histogram.observe(seconds)
+
+    def timeout_for(self, label: str):
+        default = self._defaults.get(label)
+        histogram = self.histograms.get(label)
+        if default is None or histogram is None:
+            return default
+        if histogram.count() < self.min_samples:
+            return default
+        p = histogram.quantile(self.quantile)
+        if p is None or math.isinf(p):
+            return default
+        return max(self.minimum, min(default, math.ceil(p * self.factor)))
+
+    def apply(self, label: str, client):
+        timeout = self.timeout_for(label)
+        if timeout is not None:
+            client.timeout = timeout
+
+    def snapshot(self) -> dict:
+        result = {}
+        for label, histogram in sorted(self.histograms.items()):
+            result[label] = {
+                "samples": histogram.count(),
+                "p50": histogram.quantile(0.5),
+                "p99": histogram.quantile(0.99),
+                "configured_timeout": self._defaults.get(label),
+                "effective_timeout": self.timeout_for(label),
+            }
+        return result
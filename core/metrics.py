@@ -0,0 +1,393 @@
+import json
+import math
+import os
+import threading
+import time
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._new_child()
+                self._children[key] = child
+            return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def state(self) -> list:
+        """``[label values, value]`` pairs that can be sent as JSON."""
+        with self._lock:
+            children = list(self._children.items())
+        return [[list(values), child.state()] for values, child in children]
+
+    def render(self, others: list = ()) -> list:
+        """Text lines, with the state() of other processes added in."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            children = dict(self._children)
+        if others:
+            merged = {}
+            for state in [[[v, c.state()] for v, c in children.items()], *others]:
+                for values, value in state:
+                    key = tuple(values)
+                    if key not in merged:
+                        merged[key] = self._new_child()
+                    merged[key].absorb(value)
+            children = merged
+        for values, child in sorted(children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _Value:
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def state(self) -> float:
+        with self._lock:
+            return self.value
+
+    def absorb(self, state: float):
+        self.inc(state)
+
+    def render(self, name: str, labelnames: tuple, values: tuple) -> list:
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class _HistogramValue:
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def state(self) -> list:
+        with self._lock:
+            return [list(self.counts), self.sum, self.count]
+
+    def absorb(self, state: list):
+        counts, total, count = state
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+            self.sum += total
+            self.count += count
+
+    def render(self, name: str, labelnames: tuple, values: tuple) -> list:
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        inf = 'le="+Inf"'
+        lines.append(f"{name}_bucket{_format_labels(labelnames, values, inf)} {count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {count}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 12, 20, 30, 60)
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn):
+        """Run ``fn`` before every render, to copy in state kept elsewhere."""
+        self._collectors.append(fn)
+
+    def collect(self):
+        for collect in self._collectors:
+            collect()
+
+    def state(self) -> dict:
+        self.collect()
+        return {metric.name: metric.state() for metric in self._metrics}
+
+    def render(self, others: list = ()) -> str:
+        """Text exposition; ``others`` are state() dumps of other processes
+        to add in."""
+        self.collect()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render([o[metric.name] for o in others if metric.name in o]))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsDir:
+    """Adds up the registries of every worker process on a node.
+
+    The registry is per process, so behind several gunicorn workers one
+    scrape would only see the worker that served it. Each process writes
+    its state to ``<path>/<pid>.json`` every ``interval`` seconds and
+    render() adds in the other processes' files. Files not rewritten
+    within ``max_age`` are removed, so a worker that exited drops out
+    (Prometheus reads that as a counter reset).
+    """
+
+    def __init__(self, path: str, registry: Registry | None = None, interval: float = 5.0, max_age: float | None = None):
+        self.path = path
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self.max_age = max_age if max_age is not None else interval * 3
+        self._pid = None
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def ensure_started(self):
+        # Started lazily so that gunicorn workers forked after import each
+        # write their own file.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._write_loop, name="metrics-dir", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _write_loop(self):
+        while True:
+            try:
+                self.write()
+            except OSError:
+                pass
+            time.sleep(self.interval)
+
+    def write(self):
+        path = os.path.join(self.path, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.registry.state(), f)
+        os.replace(tmp, path)
+
+    def render(self) -> str:
+        self.ensure_started()
+        own = f"{os.getpid()}.json"
+        now = time.time()
+        others = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".json") or name == own:
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    others.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return self.registry.render(others)
+
+
+REGISTRY = Registry()
+
+SOURCE_LATENCY = REGISTRY.register(Histogram(
+    "cubelytics_source_request_duration_seconds",
+    "Upstream get_profile latency per source.",
+    ("source",),
+))
+SOURCE_REQUESTS = REGISTRY.register(Counter(
+    "cubelytics_source_requests_total",
+    "Upstream get_profile calls per source by outcome.",
+    ("source", "outcome"),
+))
+SOURCE_BYTES = REGISTRY.register(Counter(
+    "cubelytics_source_response_bytes_total",
+    "Response body bytes received per source, after decompression.",
+    ("source",),
+))
+SOURCE_CPU = REGISTRY.register(Counter(
+    "cubelytics_source_cpu_seconds_total",
+    "Worker thread CPU time spent per source, mostly parsing.",
+    ("source",),
+))
+SOURCE_INFLIGHT = REGISTRY.register(Gauge(
+    "cubelytics_source_inflight_fetches",
+    "Upstream fetches currently in flight per source.",
+    ("source",),
+))
+SEARCH_RESULTS = REGISTRY.register(Counter(
+    "cubelytics_search_results_total",
+    "Source results delivered to searches by status.",
+    ("source", "status"),
+))
+SEARCHES = REGISTRY.register(Counter(
+    "cubelytics_searches_total",
+    "Searches by resolved platform, not_found or timeout.",
+    ("platform",),
+))
+OPEN_STREAMS = REGISTRY.register(Gauge(
+    "cubelytics_open_streams",
+    "SSE search streams currently open.",
+))
+RESOLVE_LATENCY = REGISTRY.register(Histogram(
+    "cubelytics_resolve_duration_seconds",
+    "Player resolution latency by call.",
+    ("call",),
+))
+RESOLVE_REQUESTS = REGISTRY.register(Counter(
+    "cubelytics_resolve_requests_total",
+    "Player resolution calls by outcome.",
+    ("call", "outcome"),
+))
+SESSION_POOL = REGISTRY.register(Gauge(
+    "cubelytics_session_pool_sessions",
+    "Pooled HTTP sessions per source by state.",
+    ("source", "state"),
+))
+SESSION_CHECKOUTS = REGISTRY.register(Counter(
+    "cubelytics_session_checkouts_total",
+    "Session pool checkouts per source.",
+    ("source",),
+))
+SESSION_WAITS = REGISTRY.register(Counter(
+    "cubelytics_session_checkout_waits_total",
+    "Session pool checkouts that waited for a session to be returned.",
+    ("source",),
+))
+SESSION_WAIT_SECONDS = REGISTRY.register(Counter(
+    "cubelytics_session_checkout_wait_seconds_total",
+    "Time spent waiting for a pooled session per source.",
+    ("source",),
+))
+
+
+def outcome_of(exc: BaseException | None) -> str:
+    """ok, not_found, timeout, transient, blocked, parse_error or error.
+
+    Client errors carry their outcome (see functions.errors); anything else
+    is classified by type. Only errors that say so are not_found: an
+    untyped ValueError is a bad payload or a parsing bug.
+    """
+    if exc is None:
+        return "ok"
+    outcome = getattr(exc, "outcome", None)
+    if isinstance(outcome, str):
+        return outcome
+    if isinstance(exc, TimeoutError) or "timeout" in type(exc).__name__.lower():
+        return "timeout"
+    if isinstance(exc, ValueError):
+        return "parse_error"
+    if isinstance(exc, OSError):
+        # requests' ConnectionError and friends.
+        return "transient"
+    return "error"
+
+
+def track_bytes(label: str, session):
+    """Count response body bytes for a session with ``on_bytes`` hooks
+    (see functions.transport); anything else is ignored."""
+    hooks = getattr(session, "on_bytes", None)
+    if not isinstance(hooks, list):
+        return
+    hooks.append(SOURCE_BYTES.labels(label).inc)
+
+
+def track_sessions(label: str, pool):
+    """Export a SessionPool's counters; anything without snapshot() is ignored."""
+    if not hasattr(pool, "snapshot"):
+        return
+
+    def collect():
+        snap = pool.snapshot()
+        SESSION_POOL.labels(label, "in_use").set(snap["in_use"])
+        SESSION_POOL.labels(label, "idle").set(snap["idle"])
+        SESSION_CHECKOUTS.labels(label).set(snap["checkouts"])
+        SESSION_WAITS.labels(label).set(snap["waits"])
+        SESSION_WAIT_SECONDS.labels(label).set(snap["wait_seconds"])
+
+    REGISTRY.add_collector(collect)
@@ -0,0 +1,108 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .executor import Bulkhead
+from .metrics import SOURCE_CPU
+
+
+class _SharedText:
+    """Pickled in place of a large page: the name of a shared memory block
+    holding its UTF-8 bytes, which the worker decodes in place."""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+
+class ParsePool:
+    """Worker processes that run clients' ``parse_page`` off the server process.
+
+    At most ``processes`` pages are parsed at once and up to ``max_queue``
+    more wait. Callers ``check`` for room before downloading a page, so a
+    full queue turns work away before it reaches the upstream; a page that
+    was downloaded anyway waits for its turn. Pages of at least
+    ``shared_min`` characters are encoded once into shared memory instead
+    of being pickled through the pool's pipe.
+    """
+
+    def __init__(self, processes: int, max_queue: int | None = None, shared_min: int = 64 * 1024):
+        self.processes = processes
+        self.shared_min = shared_min
+        self.slots = Bulkhead("parse", processes, max_queue if max_queue is not None else processes * 4)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # spawn, not fork: the server process has live threads.
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.processes,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    def check(self):
+        """Raise BulkheadFull if the parse queue is full."""
+        self.slots.check()
+
+    async def run(self, label: str, client, *args):
+        await self.slots.acquire(reject=False)
+        blocks = []
+        try:
+            packed = tuple(self._pack(arg, blocks) for arg in args)
+            loop = asyncio.get_running_loop()
+            result, cpu = await loop.run_in_executor(
+                self._get_pool(), _parse, type(client), client.parser, packed,
+            )
+            SOURCE_CPU.labels(label).inc(cpu)
+            return result
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            self.slots.release()
+
+    def _pack(self, arg, blocks: list):
+        if not isinstance(arg, str) or len(arg) < self.shared_min:
+            return arg
+        data = arg.encode("utf-8")
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        blocks.append(block)
+        block.buf[:len(data)] = data
+        return _SharedText(block.name, len(data))
+
+    def snapshot(self) -> dict:
+        return {"processes": self.processes, **self.slots.snapshot()}
+
+
+_clients = {}
+
+
+def _parse(cls, parser, args):
+    start = time.process_time()
+    client = _clients.get((cls, parser))
+    if client is None:
+        client = _clients[(cls, parser)] = cls(parser=parser)
+    result = client.parse_page(*(_unpack(arg) for arg in args))
+    return result, time.process_time() - start
+
+
+def _unpack(arg):
+    if not isinstance(arg, _SharedText):
+        return arg
+    block = shared_memory.SharedMemory(name=arg.name)
+    view = block.buf[:arg.size]
+    try:
+        return str(view, "utf-8")
+    finally:
+        view.release()
+        block.close()
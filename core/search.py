@@ -0,0 +1,453 @@
+import asyncio
+import json
+
+from .breaker import CircuitBreaker, CircuitOpen
+from .cache import CachedNotFound, ResultCache, canonical, not_found_message
+from .executor import BulkheadFull
+from .latency import TimeoutTuner
+from .metrics import (
+    RESOLVE_LATENCY,
+    RESOLVE_REQUESTS,
+    SEARCH_RESULTS,
+    SEARCHES,
+    SOURCE_INFLIGHT,
+    SOURCE_LATENCY,
+    SOURCE_REQUESTS,
+    outcome_of,
+)
+from .singleflight import SingleFlight
+
+
+class SearchPipeline:
+
+    def __init__(
+        self,
+        engine,
+        mojang,
+        clients: dict,
+        cache: ResultCache | None = None,
+        identity_sources: tuple = (),
+        speculative: bool = True,
+        deadline: float | None = None,
+        breaker_config: dict | None = None,
+        timeouts: TimeoutTuner | None = None,
+    ):
+        self.engine = engine
+        self.mojang = mojang
+        self.clients = clients
+        self.cache = cache
+        self.identity_sources = set(identity_sources)
+        self.speculative = speculative
+        self.deadline = deadline
+        self.flights = SingleFlight()
+        self.breakers = {
+            label: CircuitBreaker(label, **(breaker_config or {}))
+            for label in clients
+        }
+        self.timeouts = timeouts
+        if timeouts is not None:
+            for label, (client, _) in clients.items():
+                timeouts.register(label, client)
+
+    async def search(self, identifier: str, quorum: int | None = None):
+        if quorum is not None and quorum < 1:
+            raise ValueError("quorum must be at least 1")
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + self.deadline if self.deadline else None
+
+        # Username-keyed sources don't need the UUID, so they can start on the
+        # raw input while resolution is still in flight. Their results are
+        # held until the player is confirmed and dropped otherwise. Only
+        # valid Java names qualify: anything else (a UUID, a Bedrock
+        # gamertag with spaces) would be fetched under the wrong identifier.
+        speculative = {}
+        if self.speculative and self.mojang.NAME_RE.fullmatch(identifier):
+            for label, (client, use) in self.clients.items():
+                if use == "username":
+                    speculative[label] = asyncio.ensure_future(
+                        self._fetch(label, client, use, None, identifier)
+                    )
+
+        tasks = {}
+        refreshes = {}
+        try:
+            try:
+                resolved = await asyncio.wait_for(
+                    self._resolve(identifier),
+                    timeout=expires - loop.time() if expires else None,
+                )
+            except asyncio.TimeoutError:
+                SEARCHES.labels("timeout").inc()
+                yield {
+                    "type": "error",
+                    "message": f"Timed out resolving player '{identifier}'",
+                }
+                yield {"type": "done"}
+                return
+            if resolved is None:
+                SEARCHES.labels("not_found").inc()
+                yield {
+                    "type": "error",
+                    "message": f"Player '{identifier}' not found (Java or Bedrock)",
+                }
+                yield {"type": "done"}
+                return
+            uuid, xuid, username, platform = resolved
+            SEARCHES.labels(platform).inc()
+
+            skin_url = (
+                f"https://mc-heads.net/body/{uuid}/right"
+                if uuid
+                else f"https://mc-heads.net/body/{username}/right"
+            )
+
+            yield {
+                "type": "player",
+                "uuid": uuid,
+                "xuid": xuid,
+                "username": username,
+                "platform": platform,
+                "skin_url": skin_url,
+            }
+
+            keep_speculative = username.lower() == identifier.lower()
+            for label, (client, use) in self.clients.items():
+                if platform == "bedrock" and use == "uuid":
+                    continue
+                task = speculative.pop(label, None) if keep_speculative else None
+                if task is None:
+                    task = asyncio.ensure_future(
+                        self._fetch(label, client, use, uuid, username)
+                    )
+                tasks[task] = label
+
+            # Stop at the deadline, or once `quorum` sources have returned
+            # data. Whatever is still running is reported as timed out or, when
+            # the quorum cut it off, cancelled; shared fetches that already
+            # reached their upstream keep going and still fill the cache.
+            total = len(tasks)
+            fetched = 0
+            succeeded = 0
+            pending = set(tasks)
+            while pending and not (quorum is not None and succeeded >= quorum):
+                timeout = None
+                if expires is not None:
+                    timeout = expires - loop.time()
+                    if timeout <= 0:
+                        break
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    label, data, error, status, cached = task.result()
+                    fetched += 1
+                    if error is None:
+                        succeeded += 1
+                    SEARCH_RESULTS.labels(label, status).inc()
+                    event = {
+                        "type": "source",
+                        "label": label,
+                        "status": status,
+                        "data": data,
+                        "error": error,
+                        "fetched": fetched,
+                        "total": total,
+                    }
+                    if cached is not None:
+                        # Serve the stale result now and refresh it in the
+                        # background; changes are pushed as updates below.
+                        age, used = cached
+                        event["age"] = round(age)
+                        refresh = asyncio.ensure_future(
+                            self._refresh(label, self.clients[label][0], used)
+                        )
+                        refreshes[refresh] = (label, data)
+                    yield event
+
+            if quorum is not None and succeeded >= quorum:
+                status, error = "cancelled", "Cancelled: quorum reached"
+            else:
+                status, error = "timeout", "Timed out"
+            for task in pending:
+                fetched += 1
+                SEARCH_RESULTS.labels(tasks[task], status).inc()
+                yield {
+                    "type": "source",
+                    "label": tasks[task],
+                    "status": status,
+                    "data": None,
+                    "error": error,
+                    "fetched": fetched,
+                    "total": total,
+                }
+
+            yield {"type": "done", "refreshing": len(refreshes)}
+            if not refreshes:
+                return
+
+            # Refreshes get a deadline of their own: the search's one is
+            # already spent whenever a source timed out above.
+            expires = loop.time() + self.deadline if self.deadline else None
+            pending = set(refreshes)
+            while pending:
+                timeout = None
+                if expires is not None:
+                    timeout = expires - loop.time()
+                    if timeout <= 0:
+                        break
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    label, previous = refreshes[task]
+                    data = task.result()
+                    if data is None:
+                        continue
+                    if await loop.run_in_executor(None, _same, data, previous):
+                        continue
+                    SEARCH_RESULTS.labels(label, "updated").inc()
+                    yield {
+                        "type": "update",
+                        "label": label,
+                        "status": "ok",
+                        "data": data,
+                        "error": None,
+                    }
+            yield {"type": "refreshed"}
+        finally:
+            for task in tasks:
+                task.cancel()
+            for task in speculative.values():
+                task.cancel()
+            for task in refreshes:
+                task.cancel()
+
+    async def bulk(self, identifiers: list, concurrency: int = 8):
+        """Search many players at once, merging their events into one stream.
+
+        Only ``concurrency`` players are in flight at a time so that the
+        per-source bulkhead queues aren't flooded; repeated sources are shared
+        across players through the cache and single-flight.
+        """
+        events = asyncio.Queue()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def run(identifier):
+            async with slots:
+                # Stale results are not refreshed for bulk callers: the search
+                # is closed at "done", which cancels its refreshes and frees
+                # the slot for the next player.
+                search = self.search(identifier)
+                try:
+                    async for event in search:
+                        if event["type"] == "done":
+                            break
+                        await events.put({"query": identifier, **event})
+                except Exception as exc:
+                    await events.put({
+                        "query": identifier,
+                        "type": "error",
+                        "message": str(exc),
+                    })
+                finally:
+                    await search.aclose()
+
+        tasks = [asyncio.ensure_future(run(i)) for i in identifiers]
+        waiter = asyncio.ensure_future(asyncio.wait(tasks))
+        try:
+            while True:
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait(
+                    {getter, waiter}, return_when=asyncio.FIRST_COMPLETED,
+                )
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                while not events.empty():
+                    yield events.get_nowait()
+                break
+        finally:
+            waiter.cancel()
+            for task in tasks:
+                task.cancel()
+
+        yield {"type": "done", "players": len(identifiers)}
+
+    async def _resolve(self, identifier: str):
+        # Java and Bedrock lookups race; Java wins whenever it resolves, so the
+        # Geyser answer is only awaited once Mojang has said no.
+        java = asyncio.ensure_future(
+            self._timed_call("mojang", "resolve_both", identifier)
+        )
+        bedrock = None
+        if not self.mojang.is_uuid(identifier):
+            bedrock = asyncio.ensure_future(
+                self._timed_call("geyser", "resolve_bedrock", identifier)
+            )
+
+        try:
+            try:
+                uuid, username = await java
+            except Exception:
+                pass
+            else:
+                return uuid, None, username, "java"
+
+            if bedrock is None:
+                return None
+            try:
+                xuid = await bedrock
+            except Exception:
+                return None
+            if not xuid:
+                return None
+            return None, xuid, identifier, "bedrock"
+        finally:
+            java.cancel()
+            if bedrock is not None:
+                bedrock.cancel()
+
+    async def _timed_call(self, label, name, identifier):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        outcome = "cancelled"
+        try:
+            result = await self.engine.call(label, getattr(self.mojang, name), identifier)
+            outcome = "ok" if result else "not_found"
+            return result
+        except Exception as exc:
+            outcome = outcome_of(exc)
+            raise
+        finally:
+            RESOLVE_LATENCY.labels(name).observe(loop.time() - start)
+            RESOLVE_REQUESTS.labels(name, outcome).inc()
+
+    async def _fetch(self, label, client, use, uuid, username):
+        """Returns ``(label, data, error, status, stale)``; ``stale`` is
+        ``(age, identifier)`` when the data came from an expired cache entry."""
+        try:
+            used = uuid if use == "uuid" or (use != "username" and uuid) else username
+            try:
+                data, age = await self._lookup(label, client, used)
+            except Exception:
+                if use == "uuid" or used == username:
+                    raise
+                used = username
+                data, age = await self._lookup(label, client, used)
+            if label in self.identity_sources and isinstance(data, dict):
+                self._remember(data, uuid)
+            if age is not None:
+                return label, data, None, "stale", (age, used)
+            return label, data, None, "ok", None
+        except (CircuitOpen, BulkheadFull) as exc:
+            return label, None, str(exc), "skipped", None
+        except Exception as exc:
+            return label, None, str(exc), outcome_of(exc), None
+
+    def _remember(self, data: dict, uuid: str | None):
+        # Only a result for the resolved uuid may update the name map:
+        # scraped pages and fuzzy searches can describe another player.
+        found = data.get("uuid")
+        if not uuid or not isinstance(found, str):
+            return
+        if found.replace("-", "").lower() != uuid.replace("-", "").lower():
+            return
+        self.mojang.remember(uuid, data.get("username"))
+
+    async def _lookup(self, label, client, identifier):
+        """Returns ``(data, age)``; ``age`` is None unless the data is stale."""
+        if self.cache is not None:
+            found = await self.cache.lookup_async(label, identifier)
+            if found is not None:
+                data, age, stale = found
+                missing = not_found_message(data)
+                if missing is None:
+                    return data, age if stale else None
+                if not stale:
+                    raise CachedNotFound(missing)
+        key = (label, canonical(identifier))
+        data = await self.flights.do(
+            key,
+            lambda: self._load(label, client, identifier, key),
+        )
+        return data, None
+
+    async def _refresh(self, label, client, identifier):
+        # A failed refresh leaves the stale result in place.
+        key = (label, canonical(identifier))
+        try:
+            return await self.flights.do(
+                key,
+                lambda: self._load(label, client, identifier, key),
+            )
+        except Exception:
+            return None
+
+    async def _load(self, label, client, identifier, key):
+        breaker = self.breakers[label]
+        probe = breaker.allow()
+        if self.timeouts is not None:
+            self.timeouts.apply(label, client)
+        loop = asyncio.get_running_loop()
+        start = None
+        failed = True
+        outcome = "error"
+        inflight = SOURCE_INFLIGHT.labels(label)
+
+        def on_start():
+            # Once a slot is granted the request counts as started: if every
+            # search waiting on it disconnects it still runs to fill the
+            # cache, while queued ones are dropped. Time spent queueing is
+            # not upstream latency, so the clock starts here too.
+            nonlocal start
+            start = loop.time()
+            inflight.inc()
+            self.flights.mark_started(key)
+
+        try:
+            data = await self.engine.fetch(label, client, identifier, on_start=on_start)
+            failed = False
+            outcome = "ok"
+        except BulkheadFull:
+            failed = False
+            outcome = "rejected"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as exc:
+            outcome = outcome_of(exc)
+            if outcome == "not_found":
+                # Says nothing about the health of the upstream, and stays
+                # true for a while, so it is cached like a result. Other
+                # failures are never cached.
+                failed = False
+                if self.cache is not None:
+                    self.cache.put_not_found(label, identifier, str(exc))
+            raise
+        finally:
+            SOURCE_REQUESTS.labels(label, outcome).inc()
+            if start is None or outcome == "cancelled":
+                # Never reached the upstream, or gave up without an answer.
+                breaker.release(probe)
+            else:
+                elapsed = loop.time() - start
+                breaker.record(failed, elapsed, probe)
+                if self.timeouts is not None:
+                    self.timeouts.observe(label, elapsed)
+                SOURCE_LATENCY.labels(label).observe(elapsed)
+            if start is not None:
+                inflight.dec()
+
+        if self.cache is not None:
+            await self.cache.put_async(label, identifier, data)
+        return data
+
+
+def _same(a, b) -> bool:
+    # Values read back from the store have lists where the client returned
+    # tuples, so compare their JSON forms. Runs off the loop.
+    def dump(value):
+        return json.dumps(value, sort_keys=True, default=str)
+    return dump(a) == dump(b)
@@ -0,0 +1,71 @@
+import asyncio
+
+
+class _Flight:
+    __slots__ = ("task", "waiters", "started")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+        self.started = False
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key onto one in-flight task.
+
+    Callers are shielded from each other: cancelling one waiter leaves the
+    shared task running for the rest. When the last waiter goes away, a
+    task that has not been marked started (see ``mark_started``) is
+    cancelled; one that has is left to finish and fill the cache.
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.coalesced = 0
+        self.abandoned = 0
+        self.orphaned = 0
+        self._inflight = {}
+
+    async def do(self, key, factory):
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                if flight.started:
+                    self.orphaned += 1
+                else:
+                    flight.task.cancel()
+                    self.abandoned += 1
+
+    def mark_started(self, key):
+        flight = self._inflight.get(key)
+        if flight is not None:
+            flight.started = True
+
+    def _forget(self, key, task):
+        flight = self._inflight.get(key)
+        if flight is not None and flight.task is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the outcome as retrieved in case every waiter went away.
+            task.exception()
+
+    def snapshot(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "orphaned": self.orphaned,
+        }
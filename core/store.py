@@ -0,0 +1,176 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    source      TEXT NOT NULL,
+    identifier  TEXT NOT NULL,
+    value       BLOB NOT NULL,
+    stored_at   REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    PRIMARY KEY (source, identifier)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+
+class SQLiteStore:
+    """Node-local persistent cache shared by every worker process.
+
+    Values are zlib-compressed JSON keyed by (source, identifier) with an
+    absolute expiry; expired rows are kept for ``retain`` seconds so they
+    can still be served stale. The database runs in WAL mode so readers in all
+    workers proceed while one of them writes. Reads are synchronous and
+    belong off the event loop; writes are queued as plain values, then
+    encoded and committed in batches by a background thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        busy_timeout: float = 5.0,
+        compress_level: int = 6,
+        purge_every: float = 300,
+        retain: float = 0,
+    ):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.compress_level = compress_level
+        self.purge_every = purge_every
+        self.retain = retain
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self._local = threading.local()
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints; a crash can lose
+        # the last commits, which is fine for a cache.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = self._connect()
+            local.pid = os.getpid()
+        return local.conn
+
+    def get(self, source: str, identifier: str, stale_for: float = 0):
+        """Return ``(value, seconds_left, age)`` for a live entry, else None.
+
+        With ``stale_for``, entries that expired less than that many seconds
+        ago are returned too, with a negative ``seconds_left``.
+        """
+        now = time.time()
+        try:
+            row = self._reader().execute(
+                "SELECT value, expires_at, stored_at FROM entries"
+                " WHERE source = ? AND identifier = ? AND expires_at > ?",
+                (source, identifier, now - stale_for),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value = json.loads(zlib.decompress(row[0]))
+        except (sqlite3.Error, zlib.error, ValueError):
+            self.errors += 1
+            return None
+        self.hits += 1
+        return value, row[1] - now, now - row[2]
+
+    def put(self, source: str, identifier: str, value, ttl: float):
+        if ttl <= 0:
+            return
+        now = time.time()
+        self._writer().put((source, identifier, value, now, now + ttl))
+
+    def _encode(self, value) -> bytes:
+        return zlib.compress(
+            json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"),
+            self.compress_level,
+        )
+
+    def _writer(self) -> queue.Queue:
+        # One writer thread per process, started lazily so forked workers
+        # each get their own.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                    threading.Thread(
+                        target=self._write_loop, args=(self._queue,),
+                        name="cache-store", daemon=True,
+                    ).start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def _write_loop(self, pending: queue.Queue):
+        conn = self._connect()
+        last_purge = time.monotonic()
+        while True:
+            batch = [pending.get()]
+            while len(batch) < 256:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            rows = []
+            for source, identifier, value, stored_at, expires_at in batch:
+                try:
+                    rows.append((source, identifier, self._encode(value), stored_at, expires_at))
+                except (TypeError, ValueError):
+                    self.errors += 1
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries"
+                    " (source, identifier, value, stored_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if time.monotonic() - last_purge >= self.purge_every:
+                    conn.execute(
+                        "DELETE FROM entries WHERE expires_at <= ?",
+                        (time.time() - self.retain,),
+                    )
+                    last_purge = time.monotonic()
+                conn.execute("COMMIT")
+                self.writes += len(rows)
+            except sqlite3.Error:
+                self.errors += 1
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def snapshot(self) -> dict:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return {
+            "path": self.path,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "pending": self._queue.qsize() if self._pid == os.getpid() else 0,
+            "errors": self.errors,
+        }
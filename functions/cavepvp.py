@@ -1,33 +1,35 @@
-import requests
-from bs4 import BeautifulSoup
+from .errors import NotFound, ParseError
+from .parsing import make_soup
+from .transport import BROWSER_UA, make_session, read_text
 
 
 class CavePvPClient:
 
     BASE_URL = "https://cavepvp.com/u"
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, parser: str | None = None):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        })
+        self.parser = parser
+        self.session = make_session(BROWSER_UA)
 
     def get_profile(self, username: str) -> dict:
+        return self.parse_page(*self.fetch_page(username))
+
+    def fetch_page(self, username: str) -> tuple:
         url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(url, timeout=self.timeout)
-        resp.raise_for_status()
+        _, html = read_text(
+            self.session, url, self.timeout, not_found="Player not found on cavepvp.com",
+        )
+
+        return (html,)
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+    def parse_page(self, html: str) -> dict:
+        soup = make_soup(html, self.parser)
         result = {}
 
         details = soup.select_one("div.card-user-details")
         if not details:
-            raise ValueError("Player not found on cavepvp.com")
+            raise NotFound("Player not found on cavepvp.com")
 
         name_el = details.select_one("div.username")
         if name_el:
@@ -78,6 +80,6 @@ class CavePvPClient:
                 result["games"] = games
 
         if not result:
-            raise ValueError("Player not found on cavepvp.com")
+            raise ParseError("Unrecognised cavepvp.com profile page")
 
         return result
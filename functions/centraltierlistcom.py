@@ -1,4 +1,4 @@
-import requests
+from .transport import MCSINT_UA, AsyncSession, check_status, run_sync
 
 
 class CentralTierListClient:
@@ -6,21 +6,16 @@ class CentralTierListClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "mcsint/1.0"
-        })
+        self.session = AsyncSession(MCSINT_UA)
 
     def get_profile(self, identifier: str) -> dict:
+        return run_sync(self.get_profile_async(identifier))
+
+    async def get_profile_async(self, identifier: str) -> dict:
         url = f"{self.BASE_URL}/search_profile/{identifier}"
 
-        response = self.session.get(url, timeout=self.timeout)
+        response = await self.session.get(url, timeout=self.timeout)
 
-        if response.status_code == 404:
-            raise ValueError(f"Not found: {identifier}")
-        if response.status_code != 200:
-            raise Exception(
-                f"Request failed: {response.status_code} {response.text}"
-            )
+        check_status(response, f"Not found: {identifier}")
 
         return response.json()
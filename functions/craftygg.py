@@ -1,5 +1,8 @@
 import tls_client
-from bs4 import BeautifulSoup
+
+from .errors import ParseError
+from .parsing import make_soup
+from .transport import SessionPool, check_status
 
 
 class CraftyGGClient:
@@ -7,32 +10,37 @@ class CraftyGGClient:
     API_URL = "https://api.crafty.gg/api/v2/players"
     WEB_URL = "https://crafty.gg/@"
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, parser: str | None = None, sessions: int = 4):
         self.timeout = timeout
-        self.session = tls_client.Session(client_identifier="firefox_120")
+        self.parser = parser
+        self.sessions = SessionPool(
+            lambda: tls_client.Session(client_identifier="firefox_120"),
+            size=sessions,
+        )
 
     def get_profile(self, username: str) -> dict:
-        try:
-            data = self._try_api(username)
+        with self.sessions.session() as session:
+            data = self._try_api(session, username)
             if data:
                 return data
-        except Exception:
-            pass
 
-        return self._scrape_html(username)
+            return self._scrape_html(session, username)
 
-    def _try_api(self, username: str) -> dict | None:
-        resp = self.session.get(
+    def _try_api(self, session, username: str) -> dict | None:
+        """None when the API has no profile (404 or an empty payload), so
+        the page is scraped instead; other failures are raised."""
+        resp = session.get(
             f"{self.API_URL}/{username}",
             timeout_seconds=self.timeout,
         )
-        if resp.status_code != 200:
+        if resp.status_code == 404:
             return None
+        check_status(resp)
 
         try:
             raw = resp.json()
-        except Exception:
-            return None
+        except ValueError:
+            raise ParseError("Unrecognised crafty.gg API response")
 
         if not raw or (isinstance(raw, dict) and raw.get("error")):
             return None
@@ -99,23 +107,20 @@ class CraftyGGClient:
             return None
         return result
 
-    def _scrape_html(self, username: str) -> dict:
+    def _scrape_html(self, session, username: str) -> dict:
         url = f"{self.WEB_URL}{username}"
-        resp = self.session.get(url, timeout_seconds=self.timeout)
+        resp = session.get(url, timeout_seconds=self.timeout)
 
         if resp.status_code in (301, 302, 303, 307, 308):
             location = resp.headers.get("Location", "")
             if location:
                 if location.startswith("/"):
                     location = f"https://crafty.gg{location}"
-                resp = self.session.get(location, timeout_seconds=self.timeout)
+                resp = session.get(location, timeout_seconds=self.timeout)
 
-        if resp.status_code != 200:
-            raise ValueError(
-                f"Failed to fetch crafty.gg profile (HTTP {resp.status_code})"
-            )
+        check_status(resp, "Player not found on crafty.gg")
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = make_soup(resp.text, self.parser)
         result = {}
 
         title = soup.select_one("h1, .username, .profile-name, [class*='username']")
@@ -169,6 +174,6 @@ class CraftyGGClient:
                 result["biography"] = text
 
         if not result:
-            raise ValueError("Player not found on crafty.gg")
+            raise ParseError("Unrecognised crafty.gg profile page")
 
         return result
@@ -1,6 +1,9 @@
-import re
-import json
-import requests
+from .errors import NotFound
+from .nextflight import find_props, row_arrived
+from .transport import BROWSER_UA, make_session, read_text
+
+
+_STATS_ARRIVED = row_arrived('"stats"', '"money"')
 
 
 class DonutStatsClient:
@@ -9,14 +12,7 @@ class DonutStatsClient:
 
     def __init__(self, timeout: int = 15):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        })
+        self.session = make_session(BROWSER_UA)
 
     @staticmethod
     def _ms_to_human(ms_val) -> str:
@@ -51,14 +47,14 @@ class DonutStatsClient:
 
     def get_profile(self, username: str) -> dict:
         url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(url, timeout=self.timeout)
-        resp.raise_for_status()
-
-        html = resp.text
+        _, html = read_text(
+            self.session, url, self.timeout,
+            until=_STATS_ARRIVED, not_found="Player not found on donutstats.net",
+        )
 
         props = self._extract_rsc_props(html)
         if props is None:
-            raise ValueError("Player not found on donutstats.net")
+            raise NotFound("Player not found on donutstats.net")
 
         result = {"username": props.get("username", username)}
 
@@ -119,62 +115,8 @@ class DonutStatsClient:
 
     @staticmethod
     def _extract_rsc_props(html: str) -> dict | None:
-        pattern = r'self\.__next_f\.push\(\[1,"((?:[^"\\]|\\.)*)"\]\)'
-        for m in re.finditer(pattern, html):
-            raw = m.group(1)
-            if "stats" not in raw or "username" not in raw:
-                continue
-            if "money" not in raw:
-                continue
-
-            try:
-                decoded = raw.encode("utf-8").decode("unicode_escape")
-            except Exception:
-                decoded = raw.replace('\\"', '"').replace('\\\\', '\\')
-
-            idx = decoded.find('"stats"')
-            if idx < 0:
-                continue
-
-            brace_depth = 0
-            obj_start = None
-            for i in range(idx - 1, -1, -1):
-                ch = decoded[i]
-                if ch == '}':
-                    brace_depth += 1
-                elif ch == '{':
-                    if brace_depth == 0:
-                        obj_start = i
-                        break
-                    brace_depth -= 1
-
-            if obj_start is None:
-                continue
-
-            brace_depth = 0
-            obj_end = None
-            for i in range(obj_start, len(decoded)):
-                ch = decoded[i]
-                if ch == '{':
-                    brace_depth += 1
-                elif ch == '}':
-                    brace_depth -= 1
-                    if brace_depth == 0:
-                        obj_end = i + 1
-                        break
-
-            if obj_end is None:
-                continue
-
-            blob = decoded[obj_start:obj_end]
-            blob = blob.replace('"$undefined"', 'null')
-
-            try:
-                data = json.loads(blob)
-            except json.JSONDecodeError:
-                continue
-
-            if "stats" in data:
-                return data
-
-        return None
+        return find_props(
+            html,
+            lambda d: isinstance(d.get("stats"), dict) and "username" in d,
+            needles=('"stats"', '"username"', '"money"'),
+        )
@@ -0,0 +1,31 @@
+class SourceError(Exception):
+    """A lookup against one source failed.
+
+    ``outcome`` is the label the search pipeline records the failure under.
+    """
+
+    outcome = "error"
+
+
+class NotFound(SourceError, ValueError):
+    """The player has no profile on this source."""
+
+    outcome = "not_found"
+
+
+class TransientError(SourceError):
+    """The upstream failed in a way that may not happen again (5xx, 408)."""
+
+    outcome = "transient"
+
+
+class Blocked(SourceError):
+    """The upstream refused the request: rate limit, bot check or 401/403."""
+
+    outcome = "blocked"
+
+
+class ParseError(SourceError):
+    """The response did not have the shape the client expects."""
+
+    outcome = "parse_error"
@@ -1,34 +1,31 @@
 import re
 
-import requests
-from bs4 import BeautifulSoup
+from .errors import NotFound, ParseError
+from .parsing import make_soup
+from .transport import BROWSER_UA, make_session, read_text
 
 
 class ExtremeCraftClient:
     BASE_URL = "https://www.extremecraft.net/players"
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, parser: str | None = None):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        })
+        self.parser = parser
+        self.session = make_session(BROWSER_UA)
 
     def get_profile(self, username: str) -> dict:
         profile_url = f"{self.BASE_URL}/{username}/"
-        resp = self.session.get(profile_url, timeout=self.timeout)
-        resp.raise_for_status()
+        _, html = read_text(
+            self.session, profile_url, self.timeout,
+            not_found="Player not found on extremecraft.net",
+        )
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = make_soup(html, self.parser)
         result = {}
 
         user_section = soup.select_one("div.youplay-user div.user-data")
         if not user_section:
-            raise ValueError("Player not found on extremecraft.net")
+            raise NotFound("Player not found on extremecraft.net")
 
         h1 = user_section.find("h1")
         if h1:
@@ -67,9 +64,8 @@ class ExtremeCraftClient:
             offenses_url = f"{self.BASE_URL}/{username}/offenses/"
 
         try:
-            resp2 = self.session.get(offenses_url, timeout=self.timeout)
-            resp2.raise_for_status()
-            soup2 = BeautifulSoup(resp2.text, "html.parser")
+            _, html2 = read_text(self.session, offenses_url, self.timeout)
+            soup2 = make_soup(html2, self.parser)
 
             offenses_content = soup2.select_one("div.youplay-content div.col-md-12")
             if offenses_content:
@@ -84,7 +80,7 @@ class ExtremeCraftClient:
             pass 
 
         if not result:
-            raise ValueError("Player not found on extremecraft.net")
+            raise ParseError("Unrecognised extremecraft.net profile page")
 
         return result
 
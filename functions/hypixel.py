@@ -1,10 +1,43 @@
+import html as html_lib
 import re
-import requests
-from bs4 import BeautifulSoup
+
+from bs4 import SoupStrainer
+
+from .errors import NotFound
+from .parsing import make_soup
+from .transport import ACCEPT_HTML, BROWSER_UA, make_session, read_text
 
 
 _ZERO_VALUES = {"0", "-", "0%", "00:00", "0s", "0h0m0s", "N/A", ""}
 
+_PANEL_CLASSES = ["card-box", "stat_panel"]
+
+
+def _is_panel(value) -> bool:
+    # While the page is parsed the strainer sees the raw attribute, e.g.
+    # "card-box m-b-10", which a plain list of classes never matches.
+    if not value:
+        return False
+    classes = value.split() if isinstance(value, str) else value
+    return any(c in _PANEL_CLASSES for c in classes)
+
+
+_PANELS = SoupStrainer("div", attrs={"class": _is_panel})
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_SOCIAL_LINK_RE = re.compile(
+    r"""<a\b[^>]*\bid=["'](social_[^"']+)["'][^>]*>""", re.IGNORECASE,
+)
+_HREF_RE = re.compile(r"""\bhref=["']([^"']*)["']""", re.IGNORECASE)
+_SOCIAL_SCRIPT_RE = re.compile(
+    r'"#(social_[^"]+)"|swal\(\s*"[^"]*"\s*,\s*"([^"]*)"'
+)
+
+
+def _not_found_title(html: str) -> bool:
+    title = _TITLE_RE.search(html)
+    return title is not None and "not found" in title.group(1).lower()
+
 
 def _is_zero(value: str) -> bool:
     return value.strip().replace(",", "") in _ZERO_VALUES
@@ -14,135 +47,144 @@ class HypixelClient:
 
     BASE_URL = "https://plancke.io/hypixel/player/stats"
 
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, parser: str | None = None):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        self.parser = parser
+        self.session = make_session(BROWSER_UA, {
+            "Accept": ACCEPT_HTML,
             "Accept-Language": "en-US,en;q=0.9",
             "Referer": "https://plancke.io/",
         })
 
 
     def get_profile(self, identifier: str) -> dict:
+        return self.parse_page(*self.fetch_page(identifier))
+
+    def fetch_page(self, identifier: str) -> tuple:
         url = f"{self.BASE_URL}/{identifier}"
-        resp = self.session.get(url, timeout=self.timeout)
+        _, html = read_text(
+            self.session, url, self.timeout,
+            until=_not_found_title, not_found=f"Player '{identifier}' not found on Hypixel",
+        )
 
-        if resp.status_code != 200:
-            raise Exception(f"Request failed: {resp.status_code}")
+        if _not_found_title(html):
+            raise NotFound(f"Player '{identifier}' not found on Hypixel")
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        return (html,)
 
-        title = soup.find("title")
-        if title and "not found" in title.text.lower():
-            raise ValueError(f"Player '{identifier}' not found on Hypixel")
+    def parse_page(self, html: str) -> dict:
+        # Only the card-box and stat_panel subtrees are built; everything
+        # else on the page is skipped by the parser.
+        soup = make_soup(html, self.parser, parse_only=_PANELS)
 
-        result = {}
+        info = {}
+        status = None
+        games = {}
+        for div in soup.find_all("div", class_=_PANEL_CLASSES):
+            classes = div.get("class", [])
+            if "card-box" in classes:
+                if not info:
+                    info = self._parse_player_info(div)
+                if status is None:
+                    status = self._parse_status(div)
+            if "stat_panel" in classes:
+                parsed = self._parse_game_panel(div)
+                if parsed:
+                    games[parsed[0]] = parsed[1]
 
-        info = self._parse_player_info(soup)
+        result = {}
         if info:
             result["player_info"] = info
-        status = self._parse_status(soup)
-        if status:
-            result["status"] = status
+        result["status"] = status or "Unknown"
 
-        socials = self._parse_socials(soup, resp.text)
+        socials = self._parse_socials(html)
         if socials:
             result["socials"] = socials
-        games = self._parse_game_panels(soup)
         if games:
             result["games"] = games
 
-        if not result:
-            raise ValueError(f"No stats found for '{identifier}'")
-
         return result
 
-    def _parse_player_info(self, soup: BeautifulSoup) -> dict:
+    def _parse_player_info(self, card) -> dict:
         info = {}
-        cards = soup.find_all("div", class_="card-box")
-
-        for card in cards:
-            header = card.find("h3", class_="header-title")
-            if header and "Player Information" in header.text:
-                text = card.get_text(separator="\n")
-                for line in text.split("\n"):
-                    line = line.strip()
-                    if ":" in line:
-                        key, _, val = line.partition(":")
-                        key = key.strip().strip("*")
-                        val = val.strip()
-                        if key and val and key != "Player Information":
-                            info[key] = val
-                break
+        header = card.find("h3", class_="header-title")
+        if header and "Player Information" in header.text:
+            text = card.get_text(separator="\n")
+            for line in text.split("\n"):
+                line = line.strip()
+                if ":" in line:
+                    key, _, val = line.partition(":")
+                    key = key.strip().strip("*")
+                    val = val.strip()
+                    if key and val and key != "Player Information":
+                        info[key] = val
         return info
 
-    def _parse_status(self, soup: BeautifulSoup) -> str:
-        cards = soup.find_all("div", class_="card-box")
-        for card in cards:
-            header = card.find("h4", class_="header-title")
-            if header and "Status" in header.text:
-                b = card.find("b")
-                if b:
-                    return b.text.strip()
-        return "Unknown"
-
-    def _parse_socials(self, soup: BeautifulSoup, raw_html: str) -> dict:
-        socials = {}
+    def _parse_status(self, card) -> str | None:
+        header = card.find("h4", class_="header-title")
+        if header and "Status" in header.text:
+            b = card.find("b")
+            if b:
+                return b.text.strip()
+        return None
+
+    @staticmethod
+    def _parse_socials(raw_html: str) -> dict:
+        # One scan collects the social anchors in page order and, for each
+        # one, the first swal(...) popup value that follows its "#social_x"
+        # click handler.
+        links = {}
+        for m in _SOCIAL_LINK_RE.finditer(raw_html):
+            social_id = m.group(1)
+            if social_id not in links:
+                href = _HREF_RE.search(m.group(0))
+                links[social_id] = html_lib.unescape(href.group(1)) if href else ""
+
+        values = {}
+        waiting = []
+        for m in _SOCIAL_SCRIPT_RE.finditer(raw_html):
+            social_id, value = m.group(1), m.group(2)
+            if social_id is not None:
+                if social_id in links and social_id not in values and social_id not in waiting:
+                    waiting.append(social_id)
+            elif waiting:
+                for pending in waiting:
+                    values[pending] = value
+                waiting = []
 
-        social_links = soup.find_all("a", id=re.compile(r"^social_"))
-        for link in social_links:
-            social_id = link.get("id", "")            
+        socials = {}
+        for social_id, href in links.items():
             platform = social_id.replace("social_", "").capitalize()
-
-            pattern = re.compile(
-                r'"\#' + re.escape(social_id) + r'".*?swal\(\s*"[^"]*"\s*,\s*"([^"]*)"',
-                re.DOTALL,
-            )
-            m = pattern.search(raw_html)
-            if m:
-                socials[platform] = m.group(1)
+            if social_id in values:
+                socials[platform] = values[social_id]
+            elif href and href != "javascript:void(0)":
+                socials[platform] = href
             else:
-                href = link.get("href", "")
-                if href and href != "javascript:void(0)":
-                    socials[platform] = href
-                else:
-                    socials[platform] = "linked"
-
+                socials[platform] = "linked"
         return socials
 
-    def _parse_game_panels(self, soup: BeautifulSoup) -> dict:
-        games = {}
-        panels = soup.find_all("div", class_="stat_panel")
-
-        for panel in panels:
-            title_a = panel.find("a")
-            if not title_a:
-                continue
-            game_name = title_a.text.strip()
-
-            body = panel.find("div", class_="panel-body")
-            if not body:
-                continue
+    def _parse_game_panel(self, panel) -> tuple | None:
+        title_a = panel.find("a")
+        if not title_a:
+            return None
+        game_name = title_a.text.strip()
 
-            game_data = {}
+        body = panel.find("div", class_="panel-body")
+        if not body:
+            return None
 
-            stats = self._parse_bold_pairs(body)
-            if stats:
-                game_data["stats"] = stats
-            tables = self._parse_tables(body)
-            if tables:
-                game_data["tables"] = tables
+        game_data = {}
 
-            if game_data:
-                games[game_name] = game_data
+        stats = self._parse_bold_pairs(body)
+        if stats:
+            game_data["stats"] = stats
+        tables = self._parse_tables(body)
+        if tables:
+            game_data["tables"] = tables
 
-        return games
+        if not game_data:
+            return None
+        return game_name, game_data
 
     def _parse_bold_pairs(self, container) -> dict:
         pairs = {}
@@ -1,4 +1,5 @@
-import requests
+from .errors import NotFound
+from .transport import BROWSER_UA, AsyncSession, check_status, run_sync
 
 
 class LabyNetClient:
@@ -7,28 +8,26 @@ class LabyNetClient:
 
     def __init__(self, timeout: int = 15):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        })
+        self.session = AsyncSession(BROWSER_UA)
 
     def get_profile(self, username: str) -> dict:
-        uuid = self._resolve_uuid(username)
+        return run_sync(self.get_profile_async(username))
+
+    async def get_profile_async(self, username: str) -> dict:
+        uuid = await self._resolve_uuid(username)
         if uuid is None:
-            raise ValueError("Player not found on laby.net")
+            raise NotFound("Player not found on laby.net")
 
-        snippet = self._get_snippet(uuid)
+        snippet = await self._get_snippet(uuid)
         if snippet is None:
-            raise ValueError("Player not found on laby.net")
+            raise NotFound("Player not found on laby.net")
 
         result = {}
 
         user = snippet.get("user", {})
-        result["username"] = user.get("username") or user.get("name", username)
+        name = user.get("username") or user.get("name")
+        if name:
+            result["username"] = name
         result["uuid"] = user.get("uuid", uuid)
         history = snippet.get("name_history", [])
         if history:
@@ -63,29 +62,24 @@ class LabyNetClient:
 
         return result
 
-    def _resolve_uuid(self, username: str) -> str | None:
-        resp = self.session.get(
+    async def _resolve_uuid(self, username: str) -> str | None:
+        resp = await self.session.get(
             f"{self.SEARCH_URL}/{username}",
             timeout=self.timeout,
         )
-        if resp.status_code != 200:
-            return None
+        check_status(resp, "Player not found on laby.net")
         data = resp.json()
-        results = data.get("results", [])
-        for r in results:
-            if r.get("user_name", "").lower() == username.lower():
-                return r["uuid"]
-            if r.get("name", "").lower() == username.lower():
-                return r["uuid"]
-        if results:
-            return results[0].get("uuid")
+        # The search is fuzzy; anything but an exact name match is someone else.
+        for r in data.get("results", []):
+            names = (r.get("user_name") or "", r.get("name") or "")
+            if username.lower() in (name.lower() for name in names):
+                return r.get("uuid")
         return None
 
-    def _get_snippet(self, uuid: str) -> dict | None:
-        resp = self.session.get(
+    async def _get_snippet(self, uuid: str) -> dict | None:
+        resp = await self.session.get(
             f"{self.USER_URL}/{uuid}/get-snippet",
             timeout=self.timeout,
         )
-        if resp.status_code != 200:
-            return None
+        check_status(resp, "Player not found on laby.net")
         return resp.json()
@@ -1,32 +1,34 @@
-import requests
-from bs4 import BeautifulSoup
+from .errors import NotFound, ParseError
+from .parsing import make_soup
+from .transport import BROWSER_UA, make_session, read_text
 
 
 class LeoneMCClient:
     BASE_URL = "https://leonemc.net/user"
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, parser: str | None = None):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        })
+        self.parser = parser
+        self.session = make_session(BROWSER_UA)
 
     def get_profile(self, username: str) -> dict:
+        return self.parse_page(*self.fetch_page(username))
+
+    def fetch_page(self, username: str) -> tuple:
         url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(url, timeout=self.timeout)
-        resp.raise_for_status()
+        _, html = read_text(
+            self.session, url, self.timeout, not_found="Player not found on leonemc.net",
+        )
+
+        return (html,)
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+    def parse_page(self, html: str) -> dict:
+        soup = make_soup(html, self.parser)
         result = {}
 
         name_el = soup.select_one("h1.font-bold.text-2xl")
         if not name_el:
-            raise ValueError("Player not found on leonemc.net")
+            raise NotFound("Player not found on leonemc.net")
         result["username"] = name_el.get_text(strip=True)
         rank_el = soup.select_one("span.rounded-full.uppercase")
         if rank_el:
@@ -77,6 +79,6 @@ class LeoneMCClient:
                 result["games"] = games
 
         if not result:
-            raise ValueError("Player not found on leonemc.net")
+            raise ParseError("Unrecognised leonemc.net profile page")
 
         return result
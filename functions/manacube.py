@@ -1,4 +1,5 @@
-import requests
+from .errors import NotFound
+from .transport import BROWSER_UA, AsyncSession, check_status, run_sync
 
 
 _STAT_NAMES = {
@@ -28,30 +29,26 @@ class ManaCubeClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
+        self.session = AsyncSession(BROWSER_UA, {
             "Referer": "https://manacube.com/stats/player/",
         })
 
     def get_profile(self, uuid: str) -> dict:
-        resp = self.session.get(
+        return run_sync(self.get_profile_async(uuid))
+
+    async def get_profile_async(self, uuid: str) -> dict:
+        resp = await self.session.get(
             self.FETCH_URL,
             params={"uuid": uuid},
             timeout=self.timeout,
         )
 
-        if resp.status_code != 200:
-            raise Exception(f"ManaCube request failed: {resp.status_code}")
+        check_status(resp)
 
         data = resp.json()
 
         if not data.get("exists"):
-            raise ValueError("Player has not joined ManaCube")
+            raise NotFound("Player has not joined ManaCube")
 
         return self._clean(data)
 
@@ -1,34 +1,41 @@
 import re
 
-import requests
-from bs4 import BeautifulSoup
+from .errors import NotFound, ParseError
+from .parsing import make_soup
+from .transport import BROWSER_UA, make_session, read_text
+
+
+def _not_found_page(html: str) -> bool:
+    # Profiles open with the page header; a footer without one is the
+    # not-found page and the rest of it is never needed.
+    return "<footer" in html and "page-header" not in html
 
 
 class MCBrawlClient:
     BASE_URL = "https://www.mcbrawl.com/players"
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, parser: str | None = None):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        })
+        self.parser = parser
+        self.session = make_session(BROWSER_UA)
 
     def get_profile(self, username: str) -> dict:
-        url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(url, timeout=self.timeout)
-        resp.raise_for_status()
+        return self.parse_page(*self.fetch_page(username))
 
-        html = resp.text
+    def fetch_page(self, username: str) -> tuple:
+        url = f"{self.BASE_URL}/{username}"
+        _, html = read_text(
+            self.session, url, self.timeout,
+            until=_not_found_page, not_found="Player not found on mcbrawl.com",
+        )
 
         if "page-header" not in html:
-            raise ValueError("Player not found on mcbrawl.com")
+            raise NotFound("Player not found on mcbrawl.com")
+
+        return (html,)
 
-        soup = BeautifulSoup(html, "html.parser")
+    def parse_page(self, html: str) -> dict:
+        soup = make_soup(html, self.parser)
         result = {}
 
         header = soup.find("div", class_="page-header")
@@ -102,7 +109,7 @@ class MCBrawlClient:
             result["games"] = games
 
         if not result:
-            raise ValueError("Player not found on mcbrawl.com")
+            raise ParseError("Unrecognised mcbrawl.com profile page")
 
         return result
 
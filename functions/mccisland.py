@@ -1,4 +1,5 @@
-import requests
+from .errors import NotFound
+from .transport import API_UA, AsyncSession, check_status, run_sync
 
 
 _GAME_NAMES = {
@@ -21,28 +22,26 @@ class MccIslandClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "cubelytics/1.0",
+        self.session = AsyncSession(API_UA, {
             "Content-Type": "application/json",
         })
 
     def get_profile(self, username: str) -> dict:
-        resp = self.session.post(
+        return run_sync(self.get_profile_async(username))
+
+    async def get_profile_async(self, username: str) -> dict:
+        resp = await self.session.post(
             self.BASE_URL,
             json={"username": username},
             timeout=self.timeout,
         )
 
-        if resp.status_code == 404:
-            raise ValueError(f"Not found: {username}")
-        if resp.status_code != 200:
-            raise Exception(f"Request failed: {resp.status_code} {resp.text}")
+        check_status(resp, f"Not found: {username}")
 
         body = resp.json()
         player = (body.get("data") or {}).get("playerByUsername")
         if not player:
-            raise ValueError(f"Not found on MCC Island: {username}")
+            raise NotFound(f"Not found on MCC Island: {username}")
 
         return self._clean(player)
 
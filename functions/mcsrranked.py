@@ -1,4 +1,4 @@
-import requests
+from .transport import API_UA, AsyncSession, check_status, run_sync
 
 
 class McsrRankedClient:
@@ -7,21 +7,20 @@ class McsrRankedClient:
     def __init__(self, timeout: int = 10, season: int = 10):
         self.timeout = timeout
         self.season = season
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "cubelytics/1.0"})
+        self.session = AsyncSession(API_UA)
 
     def get_profile(self, username: str) -> dict:
+        return run_sync(self.get_profile_async(username))
+
+    async def get_profile_async(self, username: str) -> dict:
         url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(
+        resp = await self.session.get(
             url,
             params={"season": self.season},
             timeout=self.timeout,
         )
 
-        if resp.status_code == 404:
-            raise ValueError(f"Not found: {username}")
-        if resp.status_code != 200:
-            raise Exception(f"Request failed: {resp.status_code} {resp.text}")
+        check_status(resp, f"Not found: {username}")
 
         body = resp.json()
 
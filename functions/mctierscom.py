@@ -1,4 +1,4 @@
-import requests
+from .transport import MCSINT_UA, AsyncSession, check_status, run_sync
 
 
 class McTiersClient:
@@ -6,19 +6,16 @@ class McTiersClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "mcsint/1.0"
-        })
+        self.session = AsyncSession(MCSINT_UA)
 
     def get_profile(self, uuid: str) -> dict:
+        return run_sync(self.get_profile_async(uuid))
+
+    async def get_profile_async(self, uuid: str) -> dict:
         url = f"{self.BASE_URL}/profile/{uuid}"
 
-        response = self.session.get(url, timeout=self.timeout)
+        response = await self.session.get(url, timeout=self.timeout)
 
-        if response.status_code != 200:
-            raise Exception(
-                f"Request failed: {response.status_code} {response.text}"
-            )
+        check_status(response, f"Not found: {uuid}")
 
         return response.json()
@@ -1,4 +1,4 @@
-import requests
+from .transport import API_UA, AsyncSession, check_status, run_sync
 
 
 class MinecraftEarthClient:
@@ -6,16 +6,15 @@ class MinecraftEarthClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "cubelytics/1.0"})
+        self.session = AsyncSession(API_UA)
 
     def get_profile(self, identifier: str) -> dict:
+        return run_sync(self.get_profile_async(identifier))
+
+    async def get_profile_async(self, identifier: str) -> dict:
         url = f"{self.BASE_URL}/{identifier}"
-        resp = self.session.get(url, timeout=self.timeout)
+        resp = await self.session.get(url, timeout=self.timeout)
 
-        if resp.status_code == 404:
-            raise ValueError(f"Not found: {identifier}")
-        if resp.status_code != 200:
-            raise Exception(f"Request failed: {resp.status_code} {resp.text}")
+        check_status(resp, f"Not found: {identifier}")
 
         return resp.json()
@@ -1,5 +1,58 @@
 import re
-import requests
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from .errors import NotFound
+from .transport import API_UA, check_status, make_session
+
+
+_MISSING = object()
+
+
+class _TTLMap:
+    """In-process TTL map, optionally backed by a shared persistent store
+    (get/put by namespace and key, see core.store.SQLiteStore)."""
+
+    def __init__(self, max_entries: int = 50_000, store=None, namespace: str = ""):
+        self.max_entries = max_entries
+        self.store = store
+        self.namespace = namespace
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > time.monotonic():
+                    return value
+                del self._data[key]
+
+        if self.store is None:
+            return None
+        stored = self.store.get(self.namespace, key)
+        if stored is None:
+            return None
+        value, ttl, _ = stored
+        # Misses are stored as null; names come back as JSON lists.
+        value = _MISSING if value is None else tuple(value) if isinstance(value, list) else value
+        self._set(key, value, ttl)
+        return value
+
+    def set(self, key, value, ttl: float):
+        self._set(key, value, ttl)
+        if self.store is not None:
+            self.store.put(self.namespace, key, None if value is _MISSING else value, ttl)
+
+    def _set(self, key, value, ttl: float):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, time.monotonic() + ttl)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
 
 
 class MojangClient:
@@ -11,11 +64,27 @@ class MojangClient:
         r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$",
         re.IGNORECASE,
     )
+    NAME_RE = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+    BULK_SIZE = 10
 
-    def __init__(self, timeout: int = 10):
+    def __init__(
+        self,
+        timeout: int = 10,
+        cache_ttl: int = 3600,
+        negative_ttl: int = 300,
+        batch_window: float = 0.005,
+        store=None,
+    ):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "cubelytics/1.0"})
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self.batch_window = batch_window
+        self.session = make_session(API_UA)
+        self._names = _TTLMap(store=store, namespace="mojang:name")
+        self._uuids = _TTLMap(store=store, namespace="mojang:uuid")
+        self._xuids = _TTLMap(store=store, namespace="geyser:xuid")
+        self._batch = {}
+        self._batch_lock = threading.Lock()
 
     @staticmethod
     def insert_dashes(raw: str) -> str:
@@ -25,39 +94,128 @@ class MojangClient:
     def is_uuid(self, text: str) -> bool:
         return bool(self.UUID_RE.match(text))
 
+    def remember(self, uuid: str | None, username: str | None):
+        if not uuid or not username or not self.is_uuid(uuid):
+            return
+        if not self.NAME_RE.match(username):
+            return
+        uuid = self.insert_dashes(uuid).lower()
+        self._names.set(username.lower(), (uuid, username), self.cache_ttl)
+        self._uuids.set(uuid, username, self.cache_ttl)
+
     def username_to_uuid(self, username: str) -> str:
+        return self.lookup_name(username)[0]
+
+    def lookup_name(self, username: str) -> tuple[str, str]:
+        cached = self._names.get(username.lower())
+        if cached is _MISSING:
+            raise NotFound(f"Player '{username}' not found")
+        if cached is not None:
+            return cached
+
+        if self.batch_window and self.NAME_RE.match(username):
+            try:
+                found = self._batched(username).result(timeout=self.timeout)
+            except FutureTimeout:
+                found = None
+            if found is not None:
+                return found
+
         url = f"{self.API_URL}/users/profiles/minecraft/{username}"
         resp = self.session.get(url, timeout=self.timeout)
 
         if resp.status_code in (404, 204):
-            raise ValueError(f"Player '{username}' not found")
-        if resp.status_code != 200:
-            raise ConnectionError(f"Mojang API error: {resp.status_code}")
+            self._names.set(username.lower(), _MISSING, self.negative_ttl)
+            raise NotFound(f"Player '{username}' not found")
+        check_status(resp)
+
+        data = resp.json()
+        uuid = self.insert_dashes(data.get("id", ""))
+        name = data.get("name") or username
+        self.remember(uuid, name)
+        return uuid, name
+
+    def usernames_to_uuids(self, usernames: list) -> dict:
+        """Resolve up to BULK_SIZE names in one call; returns lower name -> (uuid, name)."""
+        url = f"{self.API_URL}/profiles/minecraft"
+        resp = self.session.post(url, json=list(usernames), timeout=self.timeout)
+        check_status(resp)
 
-        return self.insert_dashes(resp.json().get("id", ""))
+        found = {}
+        for profile in resp.json():
+            if not profile.get("id") or not profile.get("name"):
+                continue
+            uuid = self.insert_dashes(profile["id"])
+            self.remember(uuid, profile["name"])
+            found[profile["name"].lower()] = (uuid, profile["name"])
+        return found
+
+    def _batched(self, username: str) -> Future:
+        # Lookups arriving within batch_window of each other are sent together
+        # through the bulk endpoint by a single timer thread.
+        key = username.lower()
+        with self._batch_lock:
+            future = self._batch.get(key)
+            if future is None:
+                if not self._batch:
+                    timer = threading.Timer(self.batch_window, self._flush_batch)
+                    timer.daemon = True
+                    timer.start()
+                future = Future()
+                self._batch[key] = future
+            return future
+
+    def _flush_batch(self):
+        with self._batch_lock:
+            pending, self._batch = self._batch, {}
+
+        names = list(pending)
+        for i in range(0, len(names), self.BULK_SIZE):
+            chunk = names[i:i + self.BULK_SIZE]
+            try:
+                found = self.usernames_to_uuids(chunk)
+            except Exception:
+                found = {}
+            for name in chunk:
+                pending[name].set_result(found.get(name))
 
     def uuid_to_username(self, uuid: str) -> str:
+        key = self.insert_dashes(uuid).lower()
+        cached = self._uuids.get(key)
+        if cached is _MISSING:
+            raise NotFound(f"UUID '{uuid}' not found")
+        if cached is not None:
+            return cached
+
         clean = uuid.replace("-", "")
         url = f"{self.SESSION_URL}/session/minecraft/profile/{clean}"
         resp = self.session.get(url, timeout=self.timeout)
 
         if resp.status_code in (404, 204):
-            raise ValueError(f"UUID '{uuid}' not found")
-        if resp.status_code != 200:
-            raise ConnectionError(f"Mojang API error: {resp.status_code}")
+            self._uuids.set(key, _MISSING, self.negative_ttl)
+            raise NotFound(f"UUID '{uuid}' not found")
+        check_status(resp)
 
-        return resp.json().get("name", "")
+        username = resp.json().get("name", "")
+        self.remember(uuid, username)
+        return username
 
     def resolve_both(self, identifier: str) -> tuple[str, str]:
         if self.is_uuid(identifier):
             uuid = self.insert_dashes(identifier)
             username = self.uuid_to_username(uuid)
         else:
-            username = identifier
-            uuid = self.username_to_uuid(username)
+            uuid, username = self.lookup_name(identifier)
         return uuid, username
 
     def resolve_bedrock(self, gamertag: str) -> str | None:
+        key = gamertag.lower()
+        cached = self._xuids.get(key)
+        if cached is _MISSING:
+            return None
+        if cached is not None:
+            return cached
+
         url = f"{self.GEYSER_URL}/xbox/xuid/{gamertag}"
         try:
             resp = self.session.get(url, timeout=self.timeout)
@@ -65,7 +223,11 @@ class MojangClient:
                 data = resp.json()
                 xuid = data.get("xuid")
                 if xuid:
+                    self._xuids.set(key, str(xuid), self.cache_ttl)
                     return str(xuid)
+                self._xuids.set(key, _MISSING, self.negative_ttl)
+            elif resp.status_code in (400, 404):
+                self._xuids.set(key, _MISSING, self.negative_ttl)
         except Exception:
             pass
         return None
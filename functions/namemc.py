@@ -1,31 +1,42 @@
 import tls_client
-from bs4 import BeautifulSoup
+
+from .errors import ParseError
+from .parsing import make_soup
+from .transport import SessionPool, check_status
 
 
 class NameMCClient:
     BASE_URL = "https://namemc.com/profile"
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, parser: str | None = None, sessions: int = 4):
         self.timeout = timeout
-        self.session = tls_client.Session(client_identifier="firefox_120")
+        self.parser = parser
+        self.sessions = SessionPool(
+            lambda: tls_client.Session(client_identifier="firefox_120"),
+            size=sessions,
+        )
 
     def get_profile(self, username: str) -> dict:
+        return self.parse_page(*self.fetch_page(username))
+
+    def fetch_page(self, username: str) -> tuple:
         url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(url, timeout_seconds=self.timeout)
+        with self.sessions.session() as session:
+            resp = session.get(url, timeout_seconds=self.timeout)
+
+            if resp.status_code in (301, 302, 303, 307, 308):
+                location = resp.headers.get("Location", "")
+                if location:
+                    if location.startswith("/"):
+                        location = f"https://namemc.com{location}"
+                    resp = session.get(location, timeout_seconds=self.timeout)
 
-        if resp.status_code in (301, 302, 303, 307, 308):
-            location = resp.headers.get("Location", "")
-            if location:
-                if location.startswith("/"):
-                    location = f"https://namemc.com{location}"
-                resp = self.session.get(location, timeout_seconds=self.timeout)
+        check_status(resp, "Player not found on namemc.com")
 
-        if resp.status_code != 200:
-            raise ValueError(
-                f"Failed to fetch NameMC profile (HTTP {resp.status_code})"
-            )
+        return (resp.text,)
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+    def parse_page(self, html: str) -> dict:
+        soup = make_soup(html, self.parser)
         result = {}
 
         h1 = soup.select_one("main h1")
@@ -103,6 +114,6 @@ class NameMCClient:
                     result["skins_count"] = skins_link.get_text(strip=True)
 
         if not result:
-            raise ValueError("Player not found on namemc.com")
+            raise ParseError("Unrecognised namemc.com profile page")
 
         return result
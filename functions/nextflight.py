@@ -0,0 +1,149 @@
+import json
+import re
+
+
+_CHUNK_RE = re.compile(r'self\.__next_f\.push\(\s*\[\s*1\s*,\s*"((?:[^"\\]|\\.)*)"\s*\]\s*\)')
+_ROW_RE = re.compile(r"([0-9a-fA-F]*):([A-Z]*)")
+_ROW_END_RE = re.compile(r'(?<!\\)\\n')
+_CHUNK_END_RE = re.compile(r'(?<!\\)"\s*\]\s*\)')
+_UNDEFINED = "$undefined"
+
+
+class FlightPayload:
+    """Incremental reader for the React Server Components (flight) payload
+    that Next.js inlines as ``self.__next_f.push([1, "..."])`` scripts.
+
+    Chunks are decoded as JSON strings and split into ``id:payload`` rows
+    lazily, so a lookup only decodes the page up to the row it needs.
+    Rows are kept in ``rows`` by id.
+    """
+
+    def __init__(self, html: str):
+        self.rows = {}
+        self._chunks = _CHUNK_RE.finditer(html)
+        self._buffer = ""
+        self._rows = self._iter_rows()
+
+    def _next_chunk(self) -> bool:
+        for m in self._chunks:
+            raw = m.group(1)
+            try:
+                self._buffer += json.loads('"' + raw + '"')
+            except json.JSONDecodeError:
+                # JS-only escapes such as \x3c are not valid JSON.
+                self._buffer += raw.encode("utf-8").decode("unicode_escape", errors="replace")
+            return True
+        return False
+
+    def _iter_rows(self):
+        pos = 0
+        while True:
+            row = self._split_row(pos)
+            if row is None:
+                self._buffer = self._buffer[pos:]
+                pos = 0
+                if not self._next_chunk():
+                    return
+                continue
+            row_id, tag, payload, pos = row
+            self.rows[row_id] = (tag, payload)
+            yield row_id, tag, payload
+
+    def _split_row(self, pos: int):
+        buf = self._buffer
+        m = _ROW_RE.match(buf, pos)
+        if m is None or m.end() == len(buf):
+            return None
+        row_id, tag = m.group(1), m.group(2)
+        start = m.end()
+
+        if tag == "T":
+            # Text rows are length-prefixed (hex, UTF-8 bytes), not newline terminated.
+            comma = buf.find(",", start)
+            if comma < 0:
+                return None
+            size = int(buf[start:comma] or "0", 16)
+            rest = buf[comma + 1:].encode("utf-8")
+            if len(rest) < size:
+                return None
+            text = rest[:size].decode("utf-8", errors="ignore")
+            return row_id, tag, text, comma + 1 + len(text)
+
+        end = buf.find("\n", start)
+        if end < 0:
+            return None
+        return row_id, tag, buf[start:end], end + 1
+
+    def row(self, row_id: str):
+        if row_id in self.rows:
+            return self.rows[row_id]
+        for rid, tag, payload in self._rows:
+            if rid == row_id:
+                return tag, payload
+        return None
+
+    def find(self, predicate, needles: tuple = ()) -> dict | None:
+        """First object in a model row for which ``predicate`` holds.
+
+        Rows that do not contain every ``needle`` are skipped without being
+        JSON-decoded; reading stops at the first match.
+        """
+        for _, tag, payload in self._rows:
+            if tag:
+                continue
+            if any(n not in payload for n in needles):
+                continue
+            try:
+                value = json.loads(payload)
+            except json.JSONDecodeError:
+                continue
+            found = _walk(value, predicate)
+            if found is not None:
+                return _clean(found)
+        return None
+
+
+def find_props(html: str, predicate, needles: tuple = ()) -> dict | None:
+    return FlightPayload(html).find(predicate, needles)
+
+
+def row_arrived(*needles):
+    """Stream matcher for transport.read_text: True once every needle has
+    been seen and the flight row and push() chunk holding the last of them
+    are complete."""
+    escaped = [json.dumps(n)[1:-1] for n in needles]
+
+    def matcher(text: str) -> bool:
+        last = 0
+        for needle in escaped:
+            i = text.find(needle)
+            if i < 0:
+                return False
+            last = max(last, i)
+        end = _ROW_END_RE.search(text, last)
+        return end is not None and _CHUNK_END_RE.search(text, end.end()) is not None
+
+    return matcher
+
+
+def _walk(value, predicate):
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if predicate(node):
+                return node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+
+def _clean(value):
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clean(v) for v in value]
+    if value == _UNDEFINED:
+        return None
+    return value
@@ -1,21 +1,65 @@
 import base64
+import threading
 import time
+from concurrent.futures import Future
+
 import tls_client
 
+from .errors import NotFound, SourceError, TransientError
+from .transport import SessionPool, check_status
+
 
 class PaleTiersClient:
     BASE_URL = "https://www.paletiers.xyz"
     API_URL = "https://www.paletiers.xyz/api/tiers"
     PLAYER_API = "https://www.paletiers.xyz/api/players/"
 
-    def __init__(self, timeout: int = 15, cache_ttl: int = 60):
+    API_HEADERS = {
+        "Accept": "application/json",
+        "Referer": "https://www.paletiers.xyz/",
+    }
+
+    def __init__(
+        self,
+        timeout: int = 15,
+        cache_ttl: int = 60,
+        refresh_at: float = 0.8,
+        sessions: int = 4,
+        max_age: int | None = None,
+    ):
         self.timeout = timeout
         self.cache_ttl = cache_ttl
-        self.session = tls_client.Session(
+        self.refresh_at = refresh_at
+        # Past this age the index is not served even while refreshes fail.
+        self.max_age = max_age if max_age is not None else cache_ttl * 5
+        self.sessions = SessionPool(self._new_session, size=sessions, warm=self._warm_session)
+        self._index = None
+        self._refreshing = False
+        self._cache_lock = threading.Lock()
+
+    def get_profile(self, username: str) -> dict:
+        index = self._cached_index()
+        profile = None
+        if index is None:
+            # Only while the index downloads: the profile call does not
+            # depend on the tier data, so it runs alongside.
+            profile = _in_thread(self._get_player_profile, username)
+            index = self._get_index()
+        entry = index["players"].get(username.lower())
+        if entry is None:
+            raise NotFound("Player not found on paletiers.xyz")
+        player, rank = entry
+        # Most names are not on the list; only listed ones cost a profile call.
+        profile = profile.result() if profile is not None else self._get_player_profile(username)
+        return self._format(player, rank, index["total_players"], profile)
+
+    @staticmethod
+    def _new_session():
+        session = tls_client.Session(
             client_identifier="firefox_120",
             random_tls_extension_order=True,
         )
-        self.session.headers = {
+        session.headers = {
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) "
                 "Gecko/20100101 Firefox/120.0"
@@ -23,72 +67,110 @@ class PaleTiersClient:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
         }
-        self._cache = None
-        self._cache_time = 0.0
-        self._session_ready = False
+        return session
 
-    def get_profile(self, username: str) -> dict:
-        data = self._get_tiers()
-        player = self._find_player(data, username)
-        if player is None:
-            raise ValueError("Player not found on paletiers.xyz")
-        profile = self._get_player_profile(username)
-        return self._format(player, data, profile)
-
-    def _warm_session(self):
-        if self._session_ready:
-            return
-        self.session.get(self.BASE_URL)
-        self._session_ready = True
-
-    def _get_tiers(self) -> dict:
-        now = time.time()
-        if self._cache and (now - self._cache_time) < self.cache_ttl:
-            return self._cache
-
-        self._warm_session()
-
-        self.session.headers["Accept"] = "application/json"
-        self.session.headers["Referer"] = self.BASE_URL + "/"
-        resp = self.session.get(self.API_URL)
-        if resp.status_code != 200:
-            raise ValueError(
-                f"Failed to fetch paletiers.xyz (HTTP {resp.status_code})"
-            )
+    def _warm_session(self, session):
+        # Each session picks up the site's cookies once before its first API call.
+        session.get(self.BASE_URL, timeout_seconds=self.timeout)
 
-        data = resp.json()
-        self._cache = data
-        self._cache_time = now
-        return data
+    def _cached_index(self) -> dict | None:
+        """The index while it may be served, refreshed in the background
+        once it is due; None when it has to be loaded first."""
+        index = self._index
+        if index is None:
+            return None
+        age = time.time() - index["loaded_at"]
+        if age >= self.max_age:
+            return None
+        if age >= self.cache_ttl * self.refresh_at:
+            self._refresh_in_background()
+        return index
 
-    def _get_player_profile(self, username: str) -> dict | None:
+    def _get_index(self) -> dict:
+        index = self._cached_index()
+        if index is not None:
+            return index
+
+        # Only a cold start or an index past max_age waits; concurrent
+        # callers share one download.
+        with self._cache_lock:
+            index = self._index
+            if index is None or time.time() - index["loaded_at"] >= self.max_age:
+                try:
+                    index = self._build_index(self._download_tiers(), time.time())
+                except SourceError:
+                    raise
+                except Exception as exc:
+                    raise TransientError(f"Could not load the paletiers.xyz tier list: {exc}") from exc
+                self._index = index
+            return index
+
+    def _refresh_in_background(self):
+        with self._cache_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="paletiers-refresh", daemon=True).start()
+
+    def _refresh(self):
         try:
-            player_id = base64.b64encode(username.encode()).decode().rstrip("=")
-            self._warm_session()
-            self.session.headers["Accept"] = "application/json"
-            self.session.headers["Referer"] = self.BASE_URL + "/"
-            resp = self.session.get(self.PLAYER_API + player_id)
-            if resp.status_code == 200:
-                return resp.json()
+            self._index = self._build_index(self._download_tiers(), time.time())
         except Exception:
+            # Keep serving the previous index; the next lookup retries.
             pass
-        return None
+        finally:
+            self._refreshing = False
 
-    def _find_player(self, data: dict, username: str) -> dict | None:
-        target = username.lower()
+    def _download_tiers(self) -> dict:
+        with self.sessions.session() as session:
+            resp = session.get(
+                self.API_URL, headers=self.API_HEADERS, timeout_seconds=self.timeout,
+            )
+        check_status(resp)
+        return resp.json()
 
-        for player in data.get("overall", []):
-            if (player.get("ingame_username") or "").lower() == target:
-                return player
+    @staticmethod
+    def _build_index(data: dict, loaded_at: float) -> dict:
+        players = {}
+        overall = data.get("overall") or []
+        for i, player in enumerate(overall):
+            name = (player.get("ingame_username") or "").lower()
+            if name and name not in players:
+                players[name] = (player, i + 1)
         for gm_list in (data.get("gamemodes") or {}).values():
             if isinstance(gm_list, list):
                 for player in gm_list:
-                    if (player.get("ingame_username") or "").lower() == target:
-                        return player
+                    name = (player.get("ingame_username") or "").lower()
+                    if name and name not in players:
+                        players[name] = (player, None)
+        return {
+            "players": players,
+            "total_players": len(overall),
+            "loaded_at": loaded_at,
+        }
 
+    def _get_player_profile(self, username: str) -> dict | None:
+        try:
+            player_id = base64.b64encode(username.encode()).decode().rstrip("=")
+            with self.sessions.session() as session:
+                resp = session.get(
+                    self.PLAYER_API + player_id,
+                    headers=self.API_HEADERS,
+                    timeout_seconds=self.timeout,
+                )
+            if resp.status_code == 200:
+                return resp.json()
+        except Exception:
+            pass
         return None
 
-    def _format(self, player: dict, data: dict, profile: dict | None = None) -> dict:
+    def _format(
+        self,
+        player: dict,
+        rank: int | None,
+        total_players: int,
+        profile: dict | None = None,
+    ) -> dict:
         result = {}
 
         if player.get("ingame_username"):
@@ -129,13 +211,9 @@ class PaleTiersClient:
             result["total_score"] = total
             result["title"] = self._get_title(total)
 
-        overall = data.get("overall", [])
-        target = (player.get("ingame_username") or "").lower()
-        for i, p in enumerate(overall):
-            if (p.get("ingame_username") or "").lower() == target:
-                result["rank"] = i + 1
-                result["total_players"] = len(overall)
-                break
+        if rank is not None:
+            result["rank"] = rank
+            result["total_players"] = total_players
 
         src = profile or player
         if src.get("discord_username"):
@@ -166,3 +244,16 @@ class PaleTiersClient:
         if score >= 40:
             return "Combat Intermediate"
         return "Combat Beginner"
+
+
+def _in_thread(fn, *args) -> Future:
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name="paletiers-profile", daemon=True).start()
+    return future
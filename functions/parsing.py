@@ -0,0 +1,14 @@
+import os
+
+from bs4 import BeautifulSoup
+
+
+# Clients verified against saved pages (tests/test_parsing.py) are given
+# parser="lxml" in main.py; anything else uses this. lxml builds different
+# trees from some malformed markup, so check a new scraper's pages before
+# switching it.
+DEFAULT_PARSER = os.environ.get("HTML_PARSER") or "html.parser"
+
+
+def make_soup(markup, parser: str | None = None, parse_only=None) -> BeautifulSoup:
+    return BeautifulSoup(markup, parser or DEFAULT_PARSER, parse_only=parse_only)
@@ -1,4 +1,5 @@
-import requests
+from .errors import NotFound
+from .transport import API_UA, AsyncSession, check_status, run_sync
 
 
 class ReafyClient:
@@ -6,26 +7,25 @@ class ReafyClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "cubelytics/1.0"})
+        self.session = AsyncSession(API_UA)
 
     def get_profile(self, username: str) -> dict:
-        resp = self.session.get(
+        return run_sync(self.get_profile_async(username))
+
+    async def get_profile_async(self, username: str) -> dict:
+        resp = await self.session.get(
             self.BASE_URL,
             params={"query": username},
             timeout=self.timeout,
         )
 
-        if resp.status_code == 404:
-            raise ValueError(f"Not found: {username}")
-        if resp.status_code != 200:
-            raise Exception(f"Request failed: {resp.status_code} {resp.text}")
+        check_status(resp, f"Not found: {username}")
 
         data = resp.json()
 
         if isinstance(data, list):
             if not data:
-                raise ValueError(f"Not found: {username}")
+                raise NotFound(f"Not found: {username}")
             return data[0]
 
         return data
@@ -1,6 +1,9 @@
-import re
-import json
-import requests
+from .errors import NotFound, ParseError
+from .nextflight import find_props, row_arrived
+from .transport import ACCEPT_HTML, BROWSER_UA, make_session, read_text
+
+
+_STATS_ARRIVED = row_arrived('"player_stats"')
 
 
 class SixB6tClient:
@@ -8,69 +11,35 @@ class SixB6tClient:
 
     def __init__(self, timeout: int = 15):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        self.session = make_session(BROWSER_UA, {
+            "Accept": ACCEPT_HTML,
         })
 
     def get_profile(self, username: str) -> dict:
         url = f"{self.BASE_URL}/{username}"
-        resp = self.session.get(url, timeout=self.timeout)
-
-        if resp.status_code == 404:
-            raise ValueError(f"Not found on 6b6t: {username}")
-        if resp.status_code != 200:
-            raise Exception(f"Request failed: {resp.status_code}")
+        _, html = read_text(
+            self.session, url, self.timeout,
+            until=_STATS_ARRIVED, not_found=f"Not found on 6b6t: {username}",
+        )
 
-        stats_data = self._extract_stats(resp.text)
+        stats_data = self._extract_stats(html)
         if not stats_data:
-            raise ValueError(f"No stats found for '{username}' on 6b6t")
+            raise ParseError(f"No stats found for '{username}' on the 6b6t page")
 
         if "first_join" not in stats_data and "player_stats" not in stats_data:
-            raise ValueError(f"Player '{username}' has not joined 6b6t")
+            raise NotFound(f"Player '{username}' has not joined 6b6t")
 
         return stats_data
 
     def _extract_stats(self, html: str) -> dict | None:
-        pattern = re.compile(r'self\.__next_f\.push\(\s*\[(\d+)\s*,\s*"((?:[^"\\]|\\.)*)"\s*\]\s*\)')
-
-        for match in pattern.finditer(html):
-            raw = match.group(2)
-
-            try:
-                unescaped = raw.encode().decode('unicode_escape')
-            except Exception:
-                unescaped = raw.replace('\\"', '"').replace('\\n', '\n').replace('\\/', '/')
-
-            for line in unescaped.split('\n'):
-                line = line.strip()
-                colon_idx = line.find(':')
-                if colon_idx < 0 or colon_idx > 4:
-                    continue
-
-                payload = line[colon_idx + 1:]
-                if '"player_stats"' not in payload and '"stats"' not in payload:
-                    continue
-
-                try:
-                    arr = json.loads(payload)
-                    if isinstance(arr, list) and len(arr) >= 4:
-                        props = arr[3]
-                        if isinstance(props, dict) and "stats" in props:
-                            return self._clean_stats(props["stats"])
-                except (json.JSONDecodeError, IndexError, TypeError):
-                    continue
-
-        return None
+        props = find_props(html, lambda d: isinstance(d.get("stats"), dict), needles=('"stats"',))
+        if props is None:
+            return None
+        return self._clean_stats(props["stats"])
 
     def _clean_stats(self, raw) -> dict:
         if not isinstance(raw, dict):
-            raise ValueError("Player not found on 6b6t")
+            raise NotFound("Player not found on 6b6t")
 
         result = {}
 
@@ -82,7 +51,7 @@ class SixB6tClient:
         if not isinstance(inner, dict):
             if result:
                 return result
-            raise ValueError("Player not found on 6b6t")
+            raise NotFound("Player not found on 6b6t")
 
         if inner.get("first_join"):
             result["first_join"] = inner["first_join"]
@@ -1,4 +1,4 @@
-import requests
+from .transport import MCSINT_UA, AsyncSession, check_status, run_sync
 
 
 class SubTiersClient:
@@ -6,22 +6,18 @@ class SubTiersClient:
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "mcsint/1.0",
+        self.session = AsyncSession(MCSINT_UA, {
             "Accept": "application/json",
         })
 
     def get_profile(self, identifier: str) -> dict:
+        return run_sync(self.get_profile_async(identifier))
+
+    async def get_profile_async(self, identifier: str) -> dict:
         url = f"{self.BASE_URL}/profile/{identifier}"
-        resp = self.session.get(url, timeout=self.timeout)
+        resp = await self.session.get(url, timeout=self.timeout)
 
-        if resp.status_code == 404:
-            raise ValueError(f"Not found on subtiers.net: {identifier}")
-        if resp.status_code != 200:
-            raise Exception(
-                f"subtiers.net request failed: {resp.status_code} {resp.text}"
-            )
+        check_status(resp, f"Not found on subtiers.net: {identifier}")
 
         raw = resp.json()
         return self._format(raw)
@@ -0,0 +1,348 @@
+import asyncio
+import codecs
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .errors import Blocked, NotFound, SourceError, TransientError
+
+
+BROWSER_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+API_UA = "cubelytics/1.0"
+MCSINT_UA = "mcsint/1.0"
+
+ACCEPT_HTML = "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+
+# Connections kept alive per host; at least the largest per-source bulkhead.
+POOL_SIZE = 32
+CONNECT_TIMEOUT = 5.0
+
+MAX_BYTES = 4 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+def _accept_encoding() -> str:
+    encodings = ["gzip", "deflate"]
+    # urllib3 only decodes br when one of these is importable.
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        encodings.append("br")
+        break
+    return ", ".join(encodings)
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+
+class _Session(requests.Session):
+
+    def __init__(self):
+        super().__init__()
+        # Called with the body size of every response; read_text reports
+        # streamed bodies as it reads them.
+        self.on_bytes = []
+
+    def request(self, method, url, **kwargs):
+        # A scalar timeout becomes (connect, read) so an unreachable host
+        # fails fast instead of using the whole read budget.
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, (int, float)):
+            kwargs["timeout"] = (min(CONNECT_TIMEOUT, timeout), timeout)
+        resp = super().request(method, url, **kwargs)
+        if self.on_bytes and not kwargs.get("stream"):
+            _report_bytes(self, len(resp.content))
+        return resp
+
+
+def make_session(
+    user_agent: str = API_UA,
+    headers: dict | None = None,
+    pool_size: int = POOL_SIZE,
+) -> requests.Session:
+    """requests.Session shared by all threads of one client.
+
+    Each host gets a keep-alive pool of ``pool_size`` connections, so
+    concurrent lookups reuse TLS connections instead of discarding them
+    when the default pool of 10 is full.
+    """
+    session = _Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": user_agent,
+        "Accept-Encoding": ACCEPT_ENCODING,
+    })
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+class AsyncSession:
+    """httpx.AsyncClient for clients that fetch on the engine loop.
+
+    A client is created on first use in each event loop, so every worker
+    process gets its own pool. Connections are bounded by the source's
+    bulkhead rather than here; ``pool_size`` are kept alive per host.
+    Redirects are followed like requests does. ``hooks["response"]`` runs
+    on each response like requests' hooks, and ``on_bytes`` gets each
+    body's size like make_session's.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = API_UA,
+        headers: dict | None = None,
+        pool_size: int = POOL_SIZE,
+    ):
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept-Encoding": ACCEPT_ENCODING,
+            **(headers or {}),
+        }
+        self.pool_size = pool_size
+        self.hooks = {"response": []}
+        self.on_bytes = []
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = httpx.AsyncClient(
+                    headers=self.headers,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=None,
+                        max_keepalive_connections=self.pool_size,
+                    ),
+                )
+        return client
+
+    async def request(self, method: str, url: str, timeout: float, **kwargs) -> httpx.Response:
+        try:
+            resp = await self._get_client().request(
+                method, url,
+                timeout=httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout)),
+                **kwargs,
+            )
+        except httpx.TimeoutException:
+            # Left as is: outcome_of() reports these as timeouts.
+            raise
+        except httpx.TransportError as exc:
+            raise TransientError(f"{type(exc).__name__}: {exc}") from exc
+        for hook in self.hooks["response"]:
+            hook(resp)
+        _report_bytes(self, len(resp.content))
+        return resp
+
+    async def get(self, url: str, timeout: float, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, timeout, **kwargs)
+
+    async def post(self, url: str, timeout: float, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, timeout, **kwargs)
+
+
+_sync = threading.local()
+
+
+def run_sync(coro):
+    """Run an async client call from blocking code.
+
+    Each thread keeps one loop, so an AsyncSession's connections are
+    reused across calls made from the same thread.
+    """
+    loop = getattr(_sync, "loop", None)
+    if loop is None:
+        loop = _sync.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+def check_status(resp, not_found: str | None = None):
+    """Raise the typed error for a failed response.
+
+    With ``not_found``, a 404 raises NotFound with that message.
+    """
+    status = resp.status_code
+    if resp.headers.get("cf-mitigated") == "challenge":
+        raise Blocked(f"Blocked by a bot check (HTTP {status})")
+    if 200 <= status < 300:
+        return
+    if status == 404 and not_found is not None:
+        raise NotFound(not_found)
+    if status in (401, 403, 429):
+        raise Blocked(f"Request refused (HTTP {status})")
+    if status >= 500 or status == 408:
+        raise TransientError(f"Upstream error (HTTP {status})")
+    raise SourceError(f"Request failed (HTTP {status})")
+
+
+def read_text(
+    session,
+    url: str,
+    timeout: float,
+    until=None,
+    not_found: str | None = None,
+    max_bytes: int = MAX_BYTES,
+    **kwargs,
+):
+    """GET ``url`` and read the body incrementally.
+
+    The status is checked first (see check_status), so a failed response
+    raises before its body is read. ``until`` is called with the text
+    received so far after every chunk; once it returns True the connection
+    is closed and the partial text is returned. Bodies over ``max_bytes``
+    raise ResponseTooLarge. Returns ``(resp, text)``.
+    """
+    resp = session.get(url, timeout=timeout, stream=True, **kwargs)
+    received = 0
+    try:
+        check_status(resp, not_found)
+        decoder = codecs.getincrementaldecoder(_encoding(resp))(errors="replace")
+        parts = []
+        text = ""
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_bytes:
+                raise ResponseTooLarge(f"{url} is larger than {max_bytes} bytes")
+            parts.append(decoder.decode(chunk))
+            if until is not None:
+                text = "".join(parts)
+                parts = [text]
+                if until(text):
+                    return resp, text
+        parts.append(decoder.decode(b"", final=True))
+        return resp, "".join(parts)
+    finally:
+        resp.close()
+        _report_bytes(session, received)
+
+
+def _report_bytes(session, size: int):
+    for hook in getattr(session, "on_bytes", ()):
+        hook(size)
+
+
+def _encoding(resp) -> str:
+    encoding = resp.encoding or "utf-8"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return "utf-8"
+    # requests falls back to ISO-8859-1 for text/* without a charset; every
+    # scraped site serves UTF-8.
+    if encoding.lower() == "iso-8859-1" and "charset" not in resp.headers.get("Content-Type", "").lower():
+        return "utf-8"
+    return encoding
+
+
+class SessionPool:
+    """Fixed-size pool of HTTP sessions for clients whose session objects
+    must not be shared between threads (tls_client).
+
+    Sessions are created lazily up to ``size`` and ``warm`` runs once on
+    each new one. Idle sessions are reused most-recent first so the warm
+    connections stay hot. While ``on_bytes`` has hooks, sessions are
+    handed out wrapped so they get the body size of every response.
+    """
+
+    def __init__(self, factory, size: int = 4, warm=None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.warm = warm
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.on_bytes = []
+        self._idle = []
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def session(self):
+        session = self._checkout()
+        try:
+            yield _Metered(session, self) if self.on_bytes else session
+        finally:
+            with self._cond:
+                self._idle.append(session)
+                self._cond.notify()
+
+    def _checkout(self):
+        start = time.monotonic()
+        with self._cond:
+            waited = False
+            while not self._idle and self.created >= self.size:
+                waited = True
+                self._cond.wait()
+            session = self._idle.pop() if self._idle else None
+            if session is None:
+                self.created += 1
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_time += time.monotonic() - start
+
+        if session is None:
+            try:
+                session = self.factory()
+                if self.warm is not None:
+                    self.warm(_Metered(session, self) if self.on_bytes else session)
+            except BaseException:
+                with self._cond:
+                    self.created -= 1
+                    self._cond.notify()
+                raise
+        return session
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "created": self.created,
+                "in_use": self.created - idle,
+                "idle": idle,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_time, 3),
+            }
+
+
+class _Metered:
+    """A pooled session that reports each body's size to the pool."""
+
+    def __init__(self, session, pool: SessionPool):
+        self._session = session
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def get(self, *args, **kwargs):
+        return self._report(self._session.get(*args, **kwargs))
+
+    def post(self, *args, **kwargs):
+        return self._report(self._session.post(*args, **kwargs))
+
+    def _report(self, resp):
+        _report_bytes(self._pool, len(resp.content or b""))
+        return resp
@@ -1,4 +1,5 @@
-import requests
+from .errors import NotFound
+from .transport import BROWSER_UA, AsyncSession, check_status, run_sync
 
 
 class WynncraftClient:
@@ -6,25 +7,22 @@ class WynncraftClient:
 
     def __init__(self, timeout: int = 15):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
+        self.session = AsyncSession(BROWSER_UA, {
             "Accept": "application/json",
         })
 
     def get_profile(self, uuid: str) -> dict:
+        return run_sync(self.get_profile_async(uuid))
+
+    async def get_profile_async(self, uuid: str) -> dict:
         url = f"{self.BASE_URL}/{uuid}"
-        resp = self.session.get(url, timeout=self.timeout)
-        resp.raise_for_status()
+        resp = await self.session.get(url, timeout=self.timeout)
+        check_status(resp, "Player not found on Wynncraft")
 
         data = resp.json()
 
         if not data or "username" not in data:
-            raise ValueError("Player not found on Wynncraft")
+            raise NotFound("Player not found on Wynncraft")
 
         result = {}
 
@@ -1,10 +1,18 @@
 import json
-import queue
-import threading
 import os
 
 from flask import Flask, render_template, request, jsonify, Response
 
+from core import metrics
+from core import (
+    BoundedExecutor,
+    FetchEngine,
+    ParsePool,
+    ResultCache,
+    SearchPipeline,
+    SQLiteStore,
+    TimeoutTuner,
+)
 from functions import (
     MojangClient,
     McTiersClient,
@@ -35,34 +43,141 @@ from functions import (
 
 app = Flask(__name__)
 
-_mojang = MojangClient()
+_TLS_SESSIONS = int(os.environ.get("TLS_SESSIONS", 4))
+
+# Persistent second-level cache shared by every worker on the node; set
+# CUBELYTICS_CACHE_DB to an empty string to keep caches in memory only.
+_CACHE_DB = os.environ.get("CUBELYTICS_CACHE_DB", "cubelytics-cache.db")
+# Seconds an expired result may still be served while it is refreshed.
+_CACHE_STALE = int(os.environ.get("CACHE_STALE", 3600))
+_store = SQLiteStore(_CACHE_DB, retain=_CACHE_STALE) if _CACHE_DB else None
+
+# Parser for the scrapers whose saved pages parse identically under lxml
+# and html.parser (tests/test_parsing.py); HTML_PARSER overrides it.
+_LXML = os.environ.get("HTML_PARSER") or "lxml"
+
+_mojang = MojangClient(store=_store)
 _clients = {
-    "mctiers.com":         (McTiersClient(),         "uuid"),
-    "pvptiers.com":        (PvpTiersClient(),        "both"),
-    "centraltierlist.com": (CentralTierListClient(), "both"),
-    "hypixel (plancke)":   (HypixelClient(),         "username"),
-    "minecraftearth.org":  (MinecraftEarthClient(),  "username"),
-    "jartexnetwork.com":   (JartexClient(),          "username"),
-    "playhive.com":        (HiveClient(),            "username"),
-    "6b6t.org":            (SixB6tClient(),          "username"),
-    "pika-network.net":    (PikaClient(),            "username"),
-    "reafystats.com":      (ReafyClient(),           "username"),
-    "mcsrranked.com":      (McsrRankedClient(),      "both"),
-    "mccisland":           (MccIslandClient(),       "username"),
-    "manacube.com":        (ManaCubeClient(),        "uuid"),
-    "mcbrawl.com":         (MCBrawlClient(),         "username"),
-    "extremecraft.net":    (ExtremeCraftClient(),    "username"),
-    "cavepvp.com":         (CavePvPClient(),         "username"),
-    "wynncraft.com":       (WynncraftClient(),       "uuid"),
-    "leonemc.net":         (LeoneMCClient(),         "username"),
-    "donutstats.net":      (DonutStatsClient(),      "username"),
-    "laby.net":            (LabyNetClient(),         "username"),
-    "namemc.com":          (NameMCClient(),          "username"),
-    "crafty.gg":           (CraftyGGClient(),        "username"),
-    "paletiers.xyz":       (PaleTiersClient(),       "username"),
-    "subtiers.net":        (SubTiersClient(),        "uuid"),
+    "mctiers.com":         (McTiersClient(),                                        "uuid"),
+    "pvptiers.com":        (PvpTiersClient(),                                       "both"),
+    "centraltierlist.com": (CentralTierListClient(),                                "both"),
+    "hypixel (plancke)":   (HypixelClient(parser=_LXML),                            "username"),
+    "minecraftearth.org":  (MinecraftEarthClient(),                                 "username"),
+    "jartexnetwork.com":   (JartexClient(),                                         "username"),
+    "playhive.com":        (HiveClient(),                                           "username"),
+    "6b6t.org":            (SixB6tClient(),                                         "username"),
+    "pika-network.net":    (PikaClient(),                                           "username"),
+    "reafystats.com":      (ReafyClient(),                                          "username"),
+    "mcsrranked.com":      (McsrRankedClient(),                                     "both"),
+    "mccisland":           (MccIslandClient(),                                      "username"),
+    "manacube.com":        (ManaCubeClient(),                                       "uuid"),
+    "mcbrawl.com":         (MCBrawlClient(parser=_LXML),                            "username"),
+    "extremecraft.net":    (ExtremeCraftClient(parser=_LXML),                       "username"),
+    "cavepvp.com":         (CavePvPClient(parser=_LXML),                            "username"),
+    "wynncraft.com":       (WynncraftClient(),                                      "uuid"),
+    "leonemc.net":         (LeoneMCClient(parser=_LXML),                            "username"),
+    "donutstats.net":      (DonutStatsClient(),                                     "username"),
+    "laby.net":            (LabyNetClient(),                                        "username"),
+    "namemc.com":          (NameMCClient(parser=_LXML, sessions=_TLS_SESSIONS),     "username"),
+    "crafty.gg":           (CraftyGGClient(parser=_LXML, sessions=_TLS_SESSIONS),   "username"),
+    "paletiers.xyz":       (PaleTiersClient(sessions=_TLS_SESSIONS),                "username"),
+    "subtiers.net":        (SubTiersClient(),                                       "uuid"),
+}
+
+# Per-source concurrency limits; anything not listed gets the default.
+_bulkheads = {
+    "mojang":              16,
+    "hypixel (plancke)":   4,
+    "6b6t.org":            4,
+    "mcbrawl.com":         4,
+    "extremecraft.net":    4,
+    "cavepvp.com":         4,
+    "leonemc.net":         4,
+    "donutstats.net":      4,
+    "namemc.com":          4,
+    "crafty.gg":           4,
+    "paletiers.xyz":       4,
+}
+
+# Sources fetched with async HTTP don't hold pool threads, so they get a
+# much larger limit unless listed above.
+_ASYNC_SOURCE_LIMIT = int(os.environ.get("FETCH_ASYNC_LIMIT", 256))
+for _label, (_client, _) in _clients.items():
+    if hasattr(_client, "get_profile_async"):
+        _bulkheads.setdefault(_label, _ASYNC_SOURCE_LIMIT)
+
+_executor = BoundedExecutor(
+    max_workers=int(os.environ.get("FETCH_WORKERS", 64)),
+    limits=_bulkheads,
+    default_limit=int(os.environ.get("FETCH_SOURCE_LIMIT", 16)),
+    max_queue=int(os.environ.get("FETCH_SOURCE_QUEUE", 64)),
+)
+# Off by default; set PARSE_PROCESSES to parse scraped pages in worker processes.
+_PARSE_PROCESSES = int(os.environ.get("PARSE_PROCESSES", 0))
+_parsers = ParsePool(
+    _PARSE_PROCESSES,
+    max_queue=int(os.environ.get("PARSE_QUEUE", _PARSE_PROCESSES * 4)),
+) if _PARSE_PROCESSES > 0 else None
+_engine = FetchEngine(_executor, _parsers)
+
+# Seconds of silence before an SSE comment is sent to probe the connection.
+_SSE_HEARTBEAT = float(os.environ.get("SSE_HEARTBEAT", 5)) or None
+
+_BULK_MAX_PLAYERS = int(os.environ.get("BULK_MAX_PLAYERS", 500))
+_BULK_CONCURRENCY = int(os.environ.get("BULK_CONCURRENCY", 8))
+
+metrics.track_bytes("mojang", _mojang.session)
+for _label, (_client, _) in _clients.items():
+    metrics.track_bytes(_label, getattr(_client, "session", None))
+    metrics.track_bytes(_label, getattr(_client, "sessions", None))
+    metrics.track_sessions(_label, getattr(_client, "sessions", None))
+
+# Metrics are kept per process. With several workers, point METRICS_DIR at a
+# directory they share so /metrics adds every worker on the node together.
+_METRICS_DIR = os.environ.get("METRICS_DIR")
+_shared_metrics = metrics.MetricsDir(
+    _METRICS_DIR, interval=float(os.environ.get("METRICS_INTERVAL", 5)),
+) if _METRICS_DIR else None
+
+# Seconds a source result stays cached; anything not listed gets the default.
+_cache_ttls = {
+    "hypixel (plancke)":   120,
+    "wynncraft.com":       120,
+    "donutstats.net":      120,
+    "6b6t.org":            120,
+    "paletiers.xyz":       120,
 }
 
+_cache = ResultCache(
+    max_bytes=int(os.environ.get("CACHE_MAX_MB", 64)) * 1024 * 1024,
+    default_ttl=int(os.environ.get("CACHE_TTL", 600)),
+    ttls=_cache_ttls,
+    store=_store,
+    stale_ttl=_CACHE_STALE,
+    # "Not found" answers change far less often than stats do.
+    not_found_ttl=int(os.environ.get("CACHE_NOT_FOUND_TTL", 6 * 3600)),
+)
+_pipeline = SearchPipeline(
+    _engine,
+    _mojang,
+    _clients,
+    _cache,
+    # Sources whose results carry a current uuid + username pair.
+    identity_sources=("laby.net", "crafty.gg", "subtiers.net"),
+    speculative=os.environ.get("SPECULATIVE_FETCH", "1") != "0",
+    deadline=float(os.environ.get("SEARCH_DEADLINE", 20)) or None,
+    timeouts=TimeoutTuner(
+        factor=float(os.environ.get("TIMEOUT_FACTOR", 3)),
+        minimum=int(os.environ.get("TIMEOUT_MIN", 2)),
+    ),
+)
+
+
+@app.before_request
+def _start_metrics_writer():
+    if _shared_metrics is not None:
+        _shared_metrics.ensure_started()
+
 
 @app.route("/")
 def index():
@@ -75,98 +190,89 @@ def api_search():
     identifier = request.args.get("q", "").strip()
     if not identifier:
         return jsonify({"error": "No input provided"}), 400
+    quorum = request.args.get("quorum", type=int)
+    if quorum is not None and quorum < 1:
+        return jsonify({"error": "quorum must be at least 1"}), 400
 
     def generate():
-        uuid = None
-        xuid = None
-        username = identifier
-        platform = "java"
-
+        streams = metrics.OPEN_STREAMS.labels()
+        streams.inc()
+        # A disconnect surfaces as a failed write, after which the server
+        # closes this generator; closing the engine stream cancels the
+        # search and any fetch still queued for it.
+        events = _engine.stream(_pipeline.search(identifier, quorum), _SSE_HEARTBEAT)
         try:
-            uuid, username = _mojang.resolve_both(identifier)
-        except Exception:
-            xuid = _mojang.resolve_bedrock(identifier)
-            if xuid:
-                platform = "bedrock"
-                username = identifier
-            else:
-                yield _sse({
-                    "type": "error",
-                    "message": f"Player '{identifier}' not found (Java or Bedrock)",
-                })
-                yield _sse({"type": "done"})
-                return
-
-        skin_url = (
-            f"https://mc-heads.net/body/{uuid}/right"
-            if uuid
-            else f"https://mc-heads.net/body/{username}/right"
-        )
-
-        yield _sse({
-            "type": "player",
-            "uuid": uuid,
-            "xuid": xuid,
-            "username": username,
-            "platform": platform,
-            "skin_url": skin_url,
-        })
-
-        sources = []
-        for label, (client, use) in _clients.items():
-            if platform == "bedrock" and use == "uuid":
-                continue
-            sources.append((label, client, use))
-
-        total = len(sources)
-        results_queue = queue.Queue()
-
-        def worker(label, client, use):
-            try:
-                fn = client.get_profile
-                if use == "uuid":
-                    data = fn(uuid)
-                elif use == "username":
-                    data = fn(username)
-                else:
-                    if uuid:
-                        try:
-                            data = fn(uuid)
-                        except Exception:
-                            data = fn(username)
-                    else:
-                        data = fn(username)
-                results_queue.put((label, data, None))
-            except Exception as exc:
-                results_queue.put((label, None, str(exc)))
-
-        threads = []
-        for label, client, use in sources:
-            t = threading.Thread(target=worker, args=(label, client, use))
-            t.start()
-            threads.append(t)
-
-        fetched = 0
-        while fetched < total:
-            label, data, error = results_queue.get()
-            fetched += 1
-            yield _sse({
-                "type": "source",
-                "label": label,
-                "data": data,
-                "error": error,
-                "fetched": fetched,
-                "total": total,
-            })
-
-        for t in threads:
-            t.join()
-
-        yield _sse({"type": "done"})
+            for event in events:
+                yield ": ping\n\n" if event is None else _sse(event)
+        finally:
+            events.close()
+            streams.dec()
 
     return Response(generate(), mimetype="text/event-stream")
 
 
+@app.route("/api/bulk", methods=["POST"])
+def api_bulk():
+    """NDJSON endpoint — streams per (player, source) results for many players."""
+    body = request.get_json(silent=True) or {}
+    players = body.get("players")
+    if not isinstance(players, list) or not players:
+        return jsonify({"error": "No players provided"}), 400
+
+    identifiers = {}
+    for player in players:
+        name = str(player).strip()
+        if name:
+            identifiers.setdefault(name.lower(), name)
+    identifiers = list(identifiers.values())
+    if len(identifiers) > _BULK_MAX_PLAYERS:
+        return jsonify({
+            "error": f"At most {_BULK_MAX_PLAYERS} players per request",
+        }), 400
+
+    def generate():
+        streams = metrics.OPEN_STREAMS.labels()
+        streams.inc()
+        events = _engine.stream(_pipeline.bulk(identifiers, _BULK_CONCURRENCY))
+        try:
+            for event in events:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        finally:
+            events.close()
+            streams.dec()
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.route("/api/status")
+def api_status():
+    return jsonify({
+        "executor": _executor.snapshot(),
+        "parsers": _parsers.snapshot() if _parsers else None,
+        "cache": _cache.snapshot(),
+        "store": _store.snapshot() if _store else None,
+        "flights": _pipeline.flights.snapshot(),
+        "breakers": {
+            label: breaker.snapshot()
+            for label, breaker in _pipeline.breakers.items()
+        },
+        "timeouts": _pipeline.timeouts.snapshot(),
+        "sessions": {
+            label: client.sessions.snapshot()
+            for label, (client, _) in _clients.items()
+            if hasattr(client, "sessions")
+        },
+    })
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(
+        _shared_metrics.render() if _shared_metrics else metrics.REGISTRY.render(),
+        mimetype="text/plain; version=0.0.4",
+    )
+
+
 def _sse(obj: dict) -> str:
     return f"data: {json.dumps(obj, ensure_ascii=False)}\n\n"
 
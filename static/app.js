@@ -30,6 +30,9 @@ const SOURCE_ICONS = {
 
 let sourceBuffer = [];
 let totalSources = 0;
+// Stays open after 'done' while stale results refresh; closed when a new
+// search starts so its updates can't land on the next player's cards.
+let activeSource = null;
 
 
 form.addEventListener('submit', (e) => {
@@ -37,6 +40,8 @@ form.addEventListener('submit', (e) => {
     const q = input.value.trim();
     if (!q) return;
 
+    if (activeSource) activeSource.close();
+
     errorDiv.classList.remove('active');
     results.classList.remove('active');
     sidebar.classList.remove('active');
@@ -52,8 +57,11 @@ form.addEventListener('submit', (e) => {
     progressCount.textContent = '0 / ?';
 
     const evtSource = new EventSource(`/api/search?q=${encodeURIComponent(q)}`);
+    activeSource = evtSource;
+    let finished = false;
 
     evtSource.onmessage = (event) => {
+        if (evtSource !== activeSource) return;
         const msg = JSON.parse(event.data);
 
         switch (msg.type) {
@@ -82,7 +90,7 @@ form.addEventListener('submit', (e) => {
 
             case 'source':
                 totalSources = msg.total;
-                sourceBuffer.push({ label: msg.label, data: msg.data, error: msg.error });
+                sourceBuffer.push({ label: msg.label, data: msg.data, error: msg.error, status: msg.status, age: msg.age });
                 progressCount.textContent = `${msg.fetched} / ${msg.total}`;
                 progressFill.style.width = `${(msg.fetched / msg.total) * 100}%`;
                 progressText.textContent = msg.fetched < msg.total
@@ -91,16 +99,27 @@ form.addEventListener('submit', (e) => {
                 break;
 
             case 'done':
-                evtSource.close();
+                // Stale results stay open for their refreshes.
+                finished = true;
+                if (!msg.refreshing) evtSource.close();
                 btn.disabled = false;
                 renderAllSources();
                 setTimeout(() => progressContainer.classList.remove('active'), 800);
                 break;
+
+            case 'update':
+                updateSource(msg);
+                break;
+
+            case 'refreshed':
+                evtSource.close();
+                break;
         }
     };
 
     evtSource.onerror = () => {
         evtSource.close();
+        if (finished) return;
         errorDiv.textContent = 'Connection lost';
         errorDiv.classList.add('active');
         progressContainer.classList.remove('active');
@@ -118,9 +137,9 @@ function renderAllSources() {
     navList.innerHTML = '';
 
     sorted.forEach((src, i) => {
-        const id = `source-${i}`;
-        appendSourceCard(src.label, src.data, src.error, id);
-        appendNavItem(src.label, src.error, id);
+        src.id = `source-${i}`;
+        appendSourceCard(src.label, src.data, src.error, src.id, src.status, src.age);
+        appendNavItem(src.label, src.error, src.id);
     });
 
     sidebar.classList.add('active');
@@ -128,15 +147,50 @@ function renderAllSources() {
 }
 
 
-function appendSourceCard(label, data, error, id) {
+function updateSource(msg) {
+    const src = sourceBuffer.find(s => s.label === msg.label);
+    if (!src) return;
+    Object.assign(src, { data: msg.data, error: msg.error, status: msg.status, age: undefined });
+
+    const old = src.id && document.getElementById(src.id);
+    if (!old) return;
+    const card = buildSourceCard(src.label, src.data, src.error, src.id, src.status);
+    card.classList.toggle('open', old.classList.contains('open'));
+    old.replaceWith(card);
+}
+
+
+const STATUS_BADGES = {
+    timeout: '<span class="source-badge badge-err">Timeout</span>',
+    skipped: '<span class="source-badge badge-err">Skipped</span>',
+    cancelled: '<span class="source-badge badge-stale" title="Enough sources had already answered">Cancelled</span>',
+    not_found: '<span class="source-badge badge-err">Not found</span>',
+    blocked: '<span class="source-badge badge-err">Blocked</span>',
+    transient: '<span class="source-badge badge-err">Unavailable</span>',
+    parse_error: '<span class="source-badge badge-err">Parse error</span>',
+};
+
+function formatAge(seconds) {
+    if (seconds < 60) return `${seconds}s`;
+    if (seconds < 3600) return `${Math.floor(seconds / 60)}m`;
+    return `${Math.floor(seconds / 3600)}h`;
+}
+
+function appendSourceCard(label, data, error, id, status, age) {
+    grid.appendChild(buildSourceCard(label, data, error, id, status, age));
+}
+
+function buildSourceCard(label, data, error, id, status, age) {
     const card = document.createElement('div');
     card.className = 'source-card open';
     card.id = id;
 
     const icon = SOURCE_ICONS[label] || '📊';
-    const badge = error
-        ? '<span class="source-badge badge-err">Error</span>'
-        : '<span class="source-badge badge-ok">OK</span>';
+    const badge = status === 'stale'
+        ? `<span class="source-badge badge-stale" title="Refreshing in the background">Cached ${formatAge(age || 0)} ago</span>`
+        : STATUS_BADGES[status] || (error
+            ? '<span class="source-badge badge-err">Error</span>'
+            : '<span class="source-badge badge-ok">OK</span>');
 
     const bodyHTML = error
         ? renderError(error)
@@ -156,7 +210,7 @@ function appendSourceCard(label, data, error, id) {
         card.classList.toggle('open');
     });
 
-    grid.appendChild(card);
+    return card;
 }
 
 
@@ -0,0 +1,109 @@
+import time
+import unittest
+
+from core.breaker import CircuitBreaker, CircuitOpen
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    config = dict(min_calls=4, failure_rate=0.5, slow_call=1.0, open_for=0.05, probes=2)
+    config.update(kwargs)
+    return CircuitBreaker("test", **config)
+
+
+def _trip(breaker: CircuitBreaker):
+    for _ in range(breaker.min_calls):
+        breaker.allow()
+        breaker.record(True, 0.01)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_needs_min_calls(self):
+        breaker = _breaker()
+        for _ in range(3):
+            breaker.allow()
+            breaker.record(True, 0.01)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_opens_on_failure_rate(self):
+        breaker = _breaker()
+        for failed in (False, True, False, True):
+            breaker.allow()
+            breaker.record(failed, 0.01)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpen):
+            breaker.allow()
+        self.assertEqual(breaker.snapshot()["rejected"], 1)
+
+    def test_stays_closed_below_failure_rate(self):
+        breaker = _breaker()
+        for failed in (False, False, False, True):
+            breaker.allow()
+            breaker.record(failed, 0.01)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_opens_on_slow_calls(self):
+        breaker = _breaker(slow_rate=0.75)
+        for _ in range(4):
+            breaker.allow()
+            breaker.record(False, 2.0)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_old_calls_leave_the_window(self):
+        breaker = _breaker(window=0.05)
+        for _ in range(3):
+            breaker.allow()
+            breaker.record(True, 0.01)
+        time.sleep(0.06)
+        breaker.allow()
+        breaker.record(True, 0.01)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_admits_probes_only(self):
+        breaker = _breaker()
+        _trip(breaker)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpen):
+            breaker.allow()
+
+    def test_successful_probes_close(self):
+        breaker = _breaker()
+        _trip(breaker)
+        time.sleep(0.06)
+        for _ in range(2):
+            probe = breaker.allow()
+            breaker.record(False, 0.01, probe)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertFalse(breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        breaker = _breaker()
+        _trip(breaker)
+        time.sleep(0.06)
+        probe = breaker.allow()
+        breaker.record(True, 0.01, probe)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_slow_probe_reopens(self):
+        breaker = _breaker()
+        _trip(breaker)
+        time.sleep(0.06)
+        probe = breaker.allow()
+        breaker.record(False, 5.0, probe)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_release_frees_probe(self):
+        breaker = _breaker()
+        _trip(breaker)
+        time.sleep(0.06)
+        first = breaker.allow()
+        breaker.allow()
+        breaker.release(first)
+        self.assertTrue(breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from core.cache import ResultCache, _sizeof, not_found_message
+from core.store import SQLiteStore
+
+
+def _wait_for_writes(store: SQLiteStore, count: int):
+    deadline = time.monotonic() + 5
+    while store.writes < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_identifiers_are_canonical(self):
+        cache = ResultCache()
+        cache.put("src", " Notch ", {"rank": 1})
+        self.assertEqual(cache.get("src", "notch"), {"rank": 1})
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(default_ttl=0.05)
+        cache.put("src", "a", {"rank": 1})
+        self.assertEqual(cache.get("src", "a"), {"rank": 1})
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("src", "a"))
+        self.assertEqual(cache.snapshot()["entries"], 0)
+
+    def test_per_label_ttl(self):
+        cache = ResultCache(default_ttl=60, ttls={"fast": 0.05, "off": 0})
+        cache.put("fast", "a", 1)
+        cache.put("slow", "a", 2)
+        cache.put("off", "a", 3)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("fast", "a"))
+        self.assertEqual(cache.get("slow", "a"), 2)
+        self.assertIsNone(cache.get("off", "a"))
+
+    def test_stale_lookup(self):
+        cache = ResultCache(default_ttl=0.05, stale_ttl=60)
+        cache.put("src", "a", {"rank": 1})
+        value, _, is_stale = cache.lookup("src", "a")
+        self.assertFalse(is_stale)
+        time.sleep(0.06)
+        value, age, is_stale = cache.lookup("src", "a")
+        self.assertEqual(value, {"rank": 1})
+        self.assertTrue(is_stale)
+        self.assertGreaterEqual(age, 0.05)
+        self.assertIsNone(cache.get("src", "a"))
+        self.assertIsNone(cache.lookup("src", "a", stale=False))
+        self.assertEqual(cache.snapshot()["stale_hits"], 1)
+
+    def test_lru_eviction_by_bytes(self):
+        value = {"payload": "x" * 100}
+        size = _sizeof(value)
+        cache = ResultCache(max_bytes=size * 2)
+        cache.put("src", "a", value)
+        cache.put("src", "b", value)
+        cache.get("src", "a")
+        cache.put("src", "c", value)
+        self.assertIsNotNone(cache.get("src", "a"))
+        self.assertIsNone(cache.get("src", "b"))
+        self.assertIsNotNone(cache.get("src", "c"))
+        snapshot = cache.snapshot()
+        self.assertEqual(snapshot["evictions"], 1)
+        self.assertEqual(snapshot["bytes"], size * 2)
+
+    def test_oversized_value_is_skipped(self):
+        cache = ResultCache(max_bytes=10)
+        cache.put("src", "a", {"payload": "x" * 100})
+        self.assertIsNone(cache.get("src", "a"))
+        self.assertEqual(cache.snapshot()["bytes"], 0)
+
+    def test_not_found(self):
+        cache = ResultCache(not_found_ttl=60)
+        cache.put_not_found("src", "a", "No such player")
+        self.assertEqual(not_found_message(cache.get("src", "a")), "No such player")
+        self.assertIsNone(not_found_message({"rank": 1}))
+
+        cache = ResultCache()
+        cache.put_not_found("src", "a", "No such player")
+        self.assertIsNone(cache.get("src", "a"))
+
+    def test_put_async_sizes_off_the_loop(self):
+        threads = []
+
+        class Value:
+            def __str__(self):
+                threads.append(threading.current_thread())
+                return "value"
+
+        async def put():
+            await cache.put_async("src", "a", {"value": Value()})
+            return threading.current_thread()
+
+        cache = ResultCache()
+        loop_thread = asyncio.run(put())
+        self.assertEqual(cache.get("src", "a").keys(), {"value"})
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], loop_thread)
+
+
+class StoreFallthroughTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.db")
+
+    def test_miss_falls_through_to_store(self):
+        store = SQLiteStore(self.path)
+        ResultCache(store=store).put("src", "a", {"rank": 1})
+        _wait_for_writes(store, 1)
+
+        cache = ResultCache(store=SQLiteStore(self.path))
+        value, _, is_stale = cache.lookup("src", "a")
+        self.assertEqual(value, {"rank": 1})
+        self.assertFalse(is_stale)
+        self.assertEqual(cache.get("src", "a"), {"rank": 1})
+        snapshot = cache.snapshot()
+        self.assertEqual((snapshot["store_hits"], snapshot["hits"]), (1, 1))
+
+    def test_stale_rows_from_store(self):
+        store = SQLiteStore(self.path, retain=60)
+        ResultCache(store=store, default_ttl=0.05).put("src", "a", {"rank": 1})
+        _wait_for_writes(store, 1)
+        time.sleep(0.06)
+
+        cache = ResultCache(store=SQLiteStore(self.path), stale_ttl=60)
+        self.assertIsNone(cache.lookup("src", "a", stale=False))
+        value, _, is_stale = cache.lookup("src", "a")
+        self.assertEqual(value, {"rank": 1})
+        self.assertTrue(is_stale)
+
+    def test_lookup_async(self):
+        store = SQLiteStore(self.path)
+        ResultCache(store=store).put("src", "a", {"rank": 1})
+        _wait_for_writes(store, 1)
+
+        cache = ResultCache(store=SQLiteStore(self.path))
+        found = asyncio.run(cache.lookup_async("src", "a"))
+        self.assertEqual(found[0], {"rank": 1})
+        self.assertIsNone(asyncio.run(cache.lookup_async("src", "b")))
+        self.assertEqual(cache.snapshot()["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
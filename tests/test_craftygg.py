@@ -0,0 +1,91 @@
+import unittest
+
+from functions.craftygg import CraftyGGClient
+from functions.errors import Blocked, NotFound, ParseError, TransientError
+from functions.transport import SessionPool
+
+
+UUID = "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+PAGE = "<main><h1>Notch</h1><div class='bio'>Made the game</div></main>"
+
+
+class _Response:
+
+    def __init__(self, status_code: int = 200, body=None, text: str = ""):
+        self.status_code = status_code
+        self.body = body
+        self.text = text
+        self.headers = {}
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("not JSON")
+        return self.body
+
+
+class _Session:
+    """Answers each URL with the response registered for its prefix."""
+
+    def __init__(self, api: _Response, page: _Response | None = None):
+        self.api = api
+        self.page = page or _Response(text=PAGE)
+        self.urls = []
+
+    def get(self, url: str, timeout_seconds: float = None):
+        self.urls.append(url)
+        return self.api if url.startswith(CraftyGGClient.API_URL) else self.page
+
+
+def _client(session: _Session) -> CraftyGGClient:
+    client = CraftyGGClient()
+    client.sessions = SessionPool(lambda: session)
+    return client
+
+
+class CraftyGGTest(unittest.TestCase):
+
+    def test_api_profile(self):
+        session = _Session(_Response(body={"data": {"username": "Notch", "bio": "hi"}}))
+        self.assertEqual(
+            _client(session).get_profile("Notch"),
+            {"username": "Notch", "biography": "hi"},
+        )
+        self.assertEqual(len(session.urls), 1)
+
+    def test_scrapes_when_api_has_no_profile(self):
+        for api in (_Response(404), _Response(body={}), _Response(body={"error": "unknown"})):
+            session = _Session(api)
+            self.assertEqual(
+                _client(session).get_profile("Notch"),
+                {"username": "Notch", "biography": "Made the game"},
+            )
+            self.assertEqual(len(session.urls), 2)
+
+    def test_api_failures_are_raised(self):
+        for status, error in ((429, Blocked), (503, TransientError)):
+            session = _Session(_Response(status))
+            with self.assertRaises(error):
+                _client(session).get_profile("Notch")
+            self.assertEqual(len(session.urls), 1)
+
+        with self.assertRaises(ParseError):
+            _client(_Session(_Response(text="<html>"))).get_profile("Notch")
+
+    def test_scraped_uuid(self):
+        page = _Response(text=f"<h1>Notch</h1><span data-uuid='{UUID}'></span>")
+        profile = _client(_Session(_Response(404), page)).get_profile("Notch")
+        self.assertEqual(profile, {"username": "Notch", "uuid": UUID})
+
+    def test_page_not_found(self):
+        session = _Session(_Response(404), _Response(404))
+        with self.assertRaises(NotFound):
+            _client(session).get_profile("Notch")
+
+    def test_unrecognised_page_is_a_parse_error(self):
+        session = _Session(_Response(404), _Response(text="<html><p>Checking your browser</p></html>"))
+        with self.assertRaises(ParseError):
+            _client(session).get_profile("Notch")
+
+
+if __name__ == "__main__":
+    unittest.main()
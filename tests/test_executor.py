@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from core.executor import BoundedExecutor, BulkheadFull
+
+
+class _Gauge:
+    """Blocking call that records how many copies run at once."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value=None):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return value
+
+
+class BoundedExecutorTest(unittest.TestCase):
+
+    def test_source_limit(self):
+        executor = BoundedExecutor(max_workers=8, limits={"src": 2})
+        gauge = _Gauge()
+
+        async def run():
+            return await asyncio.gather(*(executor.run("src", gauge, i) for i in range(6)))
+
+        self.assertEqual(asyncio.run(run()), list(range(6)))
+        self.assertEqual(gauge.peak, 2)
+        self.assertEqual(executor.snapshot()["sources"]["src"]["completed"], 6)
+
+    def test_global_limit(self):
+        executor = BoundedExecutor(max_workers=2, default_limit=4)
+        gauge = _Gauge()
+
+        async def run():
+            await asyncio.gather(*(executor.run(label, gauge) for label in "abab"))
+
+        asyncio.run(run())
+        self.assertEqual(gauge.peak, 2)
+
+    def test_full_queue_is_rejected(self):
+        executor = BoundedExecutor(limits={"src": 1}, max_queue=1)
+
+        async def run():
+            return await asyncio.gather(
+                *(executor.run("src", _Gauge(), i) for i in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(results[:2], [0, 1])
+        self.assertIsInstance(results[2], BulkheadFull)
+        self.assertEqual(executor.snapshot()["sources"]["src"]["rejected"], 1)
+
+    def test_async_slots_skip_the_pool(self):
+        executor = BoundedExecutor(max_workers=1, limits={"src": 3})
+        started = []
+
+        async def fetch(i):
+            async with executor.slot("src", lambda: started.append(i), thread=False):
+                await asyncio.sleep(0.05)
+
+        async def run():
+            await asyncio.gather(*(fetch(i) for i in range(3)))
+
+        begin = time.monotonic()
+        asyncio.run(run())
+        self.assertLess(time.monotonic() - begin, 0.14)
+        self.assertEqual(sorted(started), [0, 1, 2])
+        self.assertEqual(executor.snapshot()["global"]["completed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
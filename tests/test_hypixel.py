@@ -0,0 +1,28 @@
+import unittest
+
+from functions.hypixel import HypixelClient
+
+
+PAGE = """
+<div class="container">
+<div class="card-box m-b-10"><h4 class="m-t-0 header-title">Status</h4><b>Online</b></div>
+<div class="panel panel-default stat_panel">
+<div class="panel-heading"><a href="#skywars">SkyWars</a></div>
+<div class="panel-body"><b>Kills:</b> 1,520<br><b>Souls:</b> 0<br></div>
+</div>
+</div>
+"""
+
+
+class HypixelParseTest(unittest.TestCase):
+
+    def test_panels_with_several_classes(self):
+        for parser in ("html.parser", "lxml"):
+            with self.subTest(parser=parser):
+                profile = HypixelClient(parser=parser).parse_page(PAGE)
+                self.assertEqual(profile["status"], "Online")
+                self.assertEqual(profile["games"], {"SkyWars": {"stats": {"Kills": "1,520"}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+from functions.errors import NotFound
+from functions.labynet import LabyNetClient
+
+
+UUID = "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+
+
+class _Response:
+
+    def __init__(self, body, status_code: int = 200):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self.body
+
+
+class _Session:
+
+    def __init__(self, results: list, user: dict | None = None):
+        self.results = results
+        self.user = user if user is not None else {"uuid": UUID, "username": "Notch"}
+
+    async def get(self, url: str, timeout: float):
+        if url.startswith(LabyNetClient.SEARCH_URL):
+            return _Response({"results": self.results})
+        return _Response({"user": self.user})
+
+
+def _profile(session: _Session, username: str = "Notch") -> dict:
+    client = LabyNetClient()
+    client.session = session
+    return asyncio.run(client.get_profile_async(username))
+
+
+class LabyNetTest(unittest.TestCase):
+
+    def test_exact_match(self):
+        results = [{"name": "Notch_", "uuid": "other"}, {"user_name": "NOTCH", "uuid": UUID}]
+        self.assertEqual(_profile(_Session(results)), {"username": "Notch", "uuid": UUID})
+
+    def test_fuzzy_hits_are_not_the_player(self):
+        with self.assertRaises(NotFound):
+            _profile(_Session([{"name": "Notch_", "uuid": "other"}]))
+
+    def test_username_is_not_echoed(self):
+        profile = _profile(_Session([{"name": "notch", "uuid": UUID}], user={"uuid": UUID}))
+        self.assertEqual(profile, {"uuid": UUID})
+
+
+if __name__ == "__main__":
+    unittest.main()
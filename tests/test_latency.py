@@ -0,0 +1,78 @@
+import math
+import time
+import unittest
+from types import SimpleNamespace
+
+from core.latency import LatencyHistogram, TimeoutTuner
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.count(), 0)
+        self.assertIsNone(histogram.quantile(0.5))
+
+    def test_quantiles_are_bucket_bounds(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.08)
+        for _ in range(10):
+            histogram.observe(2.5)
+        self.assertEqual(histogram.count(), 100)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.99), 3)
+
+    def test_overflow_bucket(self):
+        histogram = LatencyHistogram()
+        histogram.observe(120)
+        self.assertTrue(math.isinf(histogram.quantile(0.5)))
+
+    def test_old_slots_expire(self):
+        histogram = LatencyHistogram(slots=2, slot_seconds=0.05)
+        histogram.observe(0.2)
+        time.sleep(0.12)
+        self.assertEqual(histogram.count(), 0)
+
+
+class TimeoutTunerTest(unittest.TestCase):
+
+    def _tuner(self, timeout=10) -> tuple:
+        tuner = TimeoutTuner(factor=3, minimum=2, min_samples=5)
+        client = SimpleNamespace(timeout=timeout)
+        tuner.register("src", client)
+        return tuner, client
+
+    def test_configured_timeout_until_enough_samples(self):
+        tuner, _ = self._tuner()
+        for _ in range(4):
+            tuner.observe("src", 0.5)
+        self.assertEqual(tuner.timeout_for("src"), 10)
+
+    def test_scales_p99(self):
+        tuner, client = self._tuner()
+        for _ in range(20):
+            tuner.observe("src", 1.2)
+        # p99 bucket is 1.5s, times 3, rounded up.
+        self.assertEqual(tuner.timeout_for("src"), 5)
+        tuner.apply("src", client)
+        self.assertEqual(client.timeout, 5)
+
+    def test_clamped(self):
+        tuner, _ = self._tuner()
+        for _ in range(20):
+            tuner.observe("src", 0.01)
+        self.assertEqual(tuner.timeout_for("src"), 2)
+
+        tuner, _ = self._tuner(timeout=4)
+        for _ in range(20):
+            tuner.observe("src", 7)
+        self.assertEqual(tuner.timeout_for("src"), 4)
+
+    def test_unknown_source(self):
+        tuner, _ = self._tuner()
+        self.assertIsNone(tuner.timeout_for("other"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.metrics import Counter, Histogram, MetricsDir, Registry, track_bytes
+from functions.transport import SessionPool
+
+
+def _registry():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("source",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=(1, 5)))
+    return registry, requests, latency
+
+
+class MetricsDirTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, True)
+
+    def test_adds_up_other_workers(self):
+        registry, requests, latency = _registry()
+        requests.labels("hive").inc(2)
+        latency.labels().observe(0.5)
+        with open(os.path.join(self.path, "1.json"), "w") as f:
+            json.dump({
+                "requests_total": [[["hive"], 3], [["pika"], 1]],
+                "latency_seconds": [[[], [[0, 1], 4.0, 1]]],
+            }, f)
+
+        text = MetricsDir(self.path, registry).render()
+        self.assertIn('requests_total{source="hive"} 5', text)
+        self.assertIn('requests_total{source="pika"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="5"} 2', text)
+        self.assertIn("latency_seconds_sum 4.5", text)
+        # The live registry is not changed by rendering.
+        self.assertIn('requests_total{source="hive"} 2', registry.render())
+
+    def test_writes_own_state_and_drops_stale_files(self):
+        registry, requests, _ = _registry()
+        requests.labels("hive").inc()
+        stale = os.path.join(self.path, "2.json")
+        with open(stale, "w") as f:
+            json.dump({"requests_total": [[["hive"], 10]]}, f)
+        os.utime(stale, (0, 0))
+
+        shared = MetricsDir(self.path, registry)
+        shared.write()
+        with open(os.path.join(self.path, f"{os.getpid()}.json")) as f:
+            self.assertEqual(json.load(f)["requests_total"], [[["hive"], 1]])
+        self.assertIn('requests_total{source="hive"} 1', shared.render())
+        self.assertFalse(os.path.exists(stale))
+
+
+class _Response:
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+class _Session:
+
+    def get(self, url, **kwargs):
+        return _Response(b"x" * 10)
+
+
+class TrackBytesTest(unittest.TestCase):
+
+    def test_session_pool(self):
+        pool = SessionPool(_Session)
+        seen = []
+        pool.on_bytes.append(seen.append)
+        with pool.session() as session:
+            session.get("https://example.com")
+            session.get("https://example.com")
+        self.assertEqual(seen, [10, 10])
+
+    def test_ignores_sessions_without_hooks(self):
+        track_bytes("src", object())
+        track_bytes("src", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
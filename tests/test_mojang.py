@@ -0,0 +1,104 @@
+import hashlib
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from functions.errors import NotFound
+from functions.mojang import MojangClient
+
+
+def _uuid(name: str) -> str:
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+class _Response:
+
+    def __init__(self, status_code: int = 200, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {}
+
+    def json(self):
+        return self.body
+
+
+class _Session:
+    """Knows every name in ``players``; records each request."""
+
+    def __init__(self, players: set, bulk_status: int = 200):
+        self.players = players
+        self.bulk_status = bulk_status
+        self.posts = []
+        self.gets = []
+        self._lock = threading.Lock()
+
+    def post(self, url: str, json=None, timeout=None):
+        with self._lock:
+            self.posts.append(list(json))
+        if self.bulk_status != 200:
+            return _Response(self.bulk_status)
+        known = [name for name in json if name in self.players]
+        return _Response(body=[{"id": _uuid(name), "name": name} for name in known])
+
+    def get(self, url: str, timeout=None):
+        name = url.rsplit("/", 1)[1]
+        with self._lock:
+            self.gets.append(name)
+        if name not in self.players:
+            return _Response(404)
+        return _Response(body={"id": _uuid(name), "name": name})
+
+
+def _client(session: _Session) -> MojangClient:
+    client = MojangClient(batch_window=0.05)
+    client.session = session
+    return client
+
+
+def _lookup_all(client: MojangClient, names: list) -> list:
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        return list(pool.map(client.lookup_name, names))
+
+
+class BatchingTest(unittest.TestCase):
+
+    def test_concurrent_lookups_share_bulk_calls(self):
+        names = [f"player{i}" for i in range(12)]
+        session = _Session(set(names))
+        client = _client(session)
+
+        found = _lookup_all(client, names)
+        self.assertEqual([name for _, name in found], names)
+        self.assertEqual(sorted(len(batch) for batch in session.posts), [2, 10])
+        self.assertEqual(session.gets, [])
+
+        self.assertEqual(client.lookup_name("PLAYER3"), found[3])
+        self.assertEqual(len(session.posts), 2)
+
+    def test_unknown_names_fall_back_to_single_lookups(self):
+        session = _Session({"notch"})
+        client = _client(session)
+
+        with self.assertRaises(NotFound):
+            _lookup_all(client, ["notch", "nobody"])
+        self.assertEqual(session.posts, [["notch", "nobody"]])
+        self.assertEqual(session.gets, ["nobody"])
+
+        with self.assertRaises(NotFound):
+            client.lookup_name("nobody")
+        self.assertEqual(session.gets, ["nobody"])
+
+    def test_failed_bulk_call_falls_back(self):
+        session = _Session({"notch", "jeb_"}, bulk_status=503)
+        found = _lookup_all(_client(session), ["notch", "jeb_"])
+        self.assertEqual([name for _, name in found], ["notch", "jeb_"])
+        self.assertEqual(sorted(session.gets), ["jeb_", "notch"])
+
+    def test_invalid_names_skip_the_batch(self):
+        session = _Session({"not a name"})
+        _client(session).lookup_name("not a name")
+        self.assertEqual(session.posts, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
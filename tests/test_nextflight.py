@@ -0,0 +1,75 @@
+import json
+import unittest
+
+from functions.nextflight import FlightPayload, find_props, row_arrived
+
+
+def _push(chunk: str) -> str:
+    return f"<script>self.__next_f.push([1,{json.dumps(chunk)}])</script>"
+
+
+def _page(*chunks: str) -> str:
+    return "<html><body>" + "".join(_push(c) for c in chunks) + "</body></html>"
+
+
+# Row 1 is split across the two chunks; row 2 is a length-prefixed text
+# row ("héllo" is 6 UTF-8 bytes) directly followed by row 3.
+ROWS = (
+    '0:["$","div",null,{}]\n1:{"stats":{"kills":5,',
+    '"rank":"$undefined"}}\n2:T6,héllo3:{"a":1}\n',
+)
+
+
+class FlightPayloadTest(unittest.TestCase):
+
+    def test_row_split_across_chunks(self):
+        found = find_props(_page(*ROWS), lambda d: "stats" in d, ('"stats"',))
+        self.assertEqual(found, {"stats": {"kills": 5, "rank": None}})
+
+    def test_text_row_length_is_in_bytes(self):
+        payload = FlightPayload(_page(*ROWS))
+        self.assertEqual(payload.row("2"), ("T", "héllo"))
+        self.assertEqual(payload.row("3"), ("", '{"a":1}'))
+
+    def test_reads_lazily(self):
+        payload = FlightPayload(_page(*ROWS))
+        payload.find(lambda d: "stats" in d, ('"stats"',))
+        self.assertIn("1", payload.rows)
+        self.assertNotIn("2", payload.rows)
+
+    def test_missing_row(self):
+        payload = FlightPayload(_page(*ROWS))
+        self.assertIsNone(payload.row("9"))
+        self.assertIsNone(payload.find(lambda d: "missing" in d))
+
+    def test_needles_skip_rows(self):
+        found = find_props(_page(*ROWS), lambda d: "a" in d, ('"nope"',))
+        self.assertIsNone(found)
+
+    def test_js_escapes(self):
+        # \x3c is valid in a JS string but not in JSON.
+        html = r'<script>self.__next_f.push([1,"4:{\"html\":\"\x3cb\x3e\"}\n"])</script>'
+        self.assertEqual(find_props(html, lambda d: "html" in d), {"html": "<b>"})
+
+    def test_no_payload(self):
+        self.assertIsNone(find_props("<html></html>", lambda d: True))
+
+
+class RowArrivedTest(unittest.TestCase):
+
+    def test_waits_for_row_and_chunk_end(self):
+        html = _page(*ROWS)
+        arrived = row_arrived('"stats"')
+        needle = html.index('\\"stats\\"')
+        self.assertFalse(arrived(html[:needle]))
+        self.assertFalse(arrived(html[:needle + 20]))
+        self.assertTrue(arrived(html))
+
+    def test_every_needle(self):
+        html = _page(*ROWS)
+        self.assertFalse(row_arrived('"stats"', '"missing"')(html))
+        self.assertTrue(row_arrived('"stats"', '"a"')(html))
+
+
+if __name__ == "__main__":
+    unittest.main()
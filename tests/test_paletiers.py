@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from functions.errors import NotFound, TransientError
+from functions.paletiersxyz import PaleTiersClient
+from functions.transport import SessionPool
+
+
+TIERS = {
+    "overall": [
+        {"ingame_username": "Notch", "sword_tier": "HT1", "sword_score": 60},
+        {"ingame_username": "jeb_", "mace_tier": "LT2", "mace_score": 30},
+    ],
+    "gamemodes": {"nethpot": [{"ingame_username": "Dinnerbone", "nethpot_tier": "LT4"}]},
+}
+
+
+class _Response:
+
+    def __init__(self, status_code: int = 200, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {}
+
+    def json(self):
+        return self.body
+
+
+class _Session:
+    """Serves the tier list and every player profile, recording each URL."""
+
+    def __init__(self, tiers: _Response | None = None):
+        self.tiers = tiers or _Response(body=TIERS)
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: dict = None, timeout_seconds: float = None):
+        with self._lock:
+            self.urls.append(url)
+        if url == PaleTiersClient.API_URL:
+            return self.tiers
+        return _Response(body={"discord_username": "notch#0001", "likes": 7})
+
+    def profile_requests(self) -> int:
+        return sum(url.startswith(PaleTiersClient.PLAYER_API) for url in self.urls)
+
+
+def _client(session: _Session, **kwargs) -> PaleTiersClient:
+    client = PaleTiersClient(**kwargs)
+    client.sessions = SessionPool(lambda: session)
+    return client
+
+
+class PaleTiersTest(unittest.TestCase):
+
+    def test_cold_index(self):
+        session = _Session()
+        profile = _client(session).get_profile("notch")
+        self.assertEqual(profile["username"], "Notch")
+        self.assertEqual((profile["rank"], profile["total_players"]), (1, 2))
+        self.assertEqual((profile["discord"], profile["likes"]), ("notch#0001", 7))
+        self.assertEqual(session.profile_requests(), 1)
+
+    def test_warm_index_skips_unlisted_players(self):
+        session = _Session()
+        client = _client(session)
+        client.get_profile("Notch")
+        with self.assertRaises(NotFound):
+            client.get_profile("Herobrine")
+        self.assertEqual(session.profile_requests(), 1)
+        self.assertEqual(session.urls.count(PaleTiersClient.API_URL), 1)
+
+    def test_warm_index_fetches_listed_players(self):
+        session = _Session()
+        client = _client(session)
+        client.get_profile("Notch")
+        profile = client.get_profile("dinnerbone")
+        self.assertEqual(profile["gamemodes"], {"nethpot": {"tier": "LT4"}})
+        self.assertNotIn("rank", profile)
+        self.assertEqual(session.profile_requests(), 2)
+
+    def test_refreshes_in_background_when_due(self):
+        session = _Session()
+        client = _client(session, cache_ttl=60)
+        client.get_profile("Notch")
+        stale = client._index
+        stale["loaded_at"] -= 50
+        self.assertEqual(client.get_profile("Notch")["rank"], 1)
+        for _ in range(100):
+            if client._index is not stale:
+                break
+            time.sleep(0.01)
+        self.assertIsNot(client._index, stale)
+        self.assertEqual(session.urls.count(PaleTiersClient.API_URL), 2)
+
+    def test_index_past_max_age_is_not_served(self):
+        session = _Session()
+        client = _client(session, cache_ttl=60, max_age=120)
+        client.get_profile("Notch")
+        client._index["loaded_at"] -= 200
+        session.tiers = _Response(503)
+        with self.assertRaises(TransientError):
+            client.get_profile("Notch")
+        session.tiers = _Response(body=TIERS)
+        self.assertEqual(client.get_profile("Notch")["rank"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import unittest
+
+from core.engine import FetchEngine
+from core.executor import BoundedExecutor, BulkheadFull
+from core.parsepool import ParsePool
+
+
+class _Client:
+    """Picklable by reference, so the spawned workers can build one."""
+
+    def __init__(self, parser=None, release: threading.Event | None = None):
+        self.parser = parser
+        self.release = release
+        self.fetched = 0
+
+    def fetch_page(self, name: str) -> tuple:
+        self.fetched += 1
+        if self.release is not None:
+            self.release.wait(5)
+        return (f"<p>{name}</p>" * 20, "!")
+
+    def parse_page(self, html: str, suffix: str) -> dict:
+        return {"length": len(html), "text": html[3:html.index("<", 3)] + suffix}
+
+
+class ParsePoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parsers = ParsePool(1, max_queue=0, shared_min=64)
+        cls.engine = FetchEngine(BoundedExecutor(max_workers=4), cls.parsers)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parsers._get_pool().shutdown()
+
+    def test_parses_in_a_worker(self):
+        result = asyncio.run(self.engine.fetch("src", _Client(), "héllo"))
+        self.assertEqual(result, {"length": len("<p>héllo</p>") * 20, "text": "héllo!"})
+
+    def test_full_queue_rejects_before_the_download(self):
+        client = _Client()
+
+        async def fetch():
+            await self.parsers.slots.acquire()
+            try:
+                await self.engine.fetch("src", client, "notch")
+            finally:
+                self.parsers.slots.release()
+
+        with self.assertRaises(BulkheadFull):
+            asyncio.run(fetch())
+        self.assertEqual(client.fetched, 0)
+
+    def test_downloaded_page_waits_for_a_slot(self):
+        release = threading.Event()
+        client = _Client(release=release)
+
+        async def fetch():
+            task = asyncio.ensure_future(self.engine.fetch("src", client, "notch"))
+            while client.fetched == 0:
+                await asyncio.sleep(0.01)
+            await self.parsers.slots.acquire()
+            release.set()
+            await asyncio.sleep(0.1)
+            self.parsers.slots.release()
+            return await task
+
+        self.assertEqual(asyncio.run(fetch())["text"], "notch!")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import unittest
+
+from functions.cavepvp import CavePvPClient
+from functions.craftygg import CraftyGGClient
+from functions.extremecraft import ExtremeCraftClient
+from functions.hypixel import HypixelClient
+from functions.leonemc import LeoneMCClient
+from functions.mcbrawl import MCBrawlClient
+from functions.namemc import NameMCClient
+
+
+PAGES = os.path.join(os.path.dirname(__file__), "pages")
+
+
+def _page(name: str) -> str:
+    with open(os.path.join(PAGES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class _Response:
+    """Enough of a requests or tls_client response for the scrapers."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.status_code = 200
+        self.encoding = "utf-8"
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+
+    def iter_content(self, chunk_size: int):
+        data = self.text.encode("utf-8")
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class _Pages:
+    """Session answering each URL with the saved page for its suffix."""
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+
+    def get(self, url: str, **kwargs):
+        for suffix, name in self.pages.items():
+            if url.endswith(suffix):
+                return _Response(_page(name))
+        raise AssertionError(f"unexpected request for {url}")
+
+
+def _profiles(parser: str) -> dict:
+    extremecraft = ExtremeCraftClient(parser=parser)
+    extremecraft.session = _Pages({
+        "/offenses/": "extremecraft-offenses.html",
+        "/Notch/": "extremecraft.html",
+    })
+    crafty = _Pages({"/@Notch": "craftygg.html"})
+    return {
+        "cavepvp": CavePvPClient(parser=parser).parse_page(_page("cavepvp.html")),
+        "crafty.gg": CraftyGGClient(parser=parser)._scrape_html(crafty, "Notch"),
+        "extremecraft": extremecraft.get_profile("Notch"),
+        "hypixel": HypixelClient(parser=parser).parse_page(_page("hypixel.html")),
+        "leonemc": LeoneMCClient(parser=parser).parse_page(_page("leonemc.html")),
+        "mcbrawl": MCBrawlClient(parser=parser).parse_page(_page("mcbrawl.html")),
+        "namemc": NameMCClient(parser=parser).parse_page(_page("namemc.html")),
+    }
+
+
+class ParserEquivalenceTest(unittest.TestCase):
+    """A client may only be switched to lxml (see main.py) once its saved
+    pages parse to the same profile as with html.parser."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.html_parser = _profiles("html.parser")
+        cls.lxml = _profiles("lxml")
+
+    def test_lxml_matches_html_parser(self):
+        for source, profile in self.html_parser.items():
+            with self.subTest(source=source):
+                self.assertEqual(self.lxml[source], profile)
+
+    def test_saved_pages_parse(self):
+        profiles = self.html_parser
+        self.assertEqual(profiles["cavepvp"]["games"]["HCF"]["KDR"], "2.65")
+        self.assertEqual(profiles["crafty.gg"]["uuid"], "069a79f4-44e9-4726-a5be-fca90e38aaf5")
+        self.assertEqual(len(profiles["extremecraft"]["offenses"]), 2)
+        self.assertEqual(profiles["hypixel"]["status"], "Offline")
+        self.assertEqual(profiles["hypixel"]["player_info"]["Level"], "250.31")
+        self.assertEqual(sorted(profiles["hypixel"]["games"]), ["BedWars", "SkyWars"])
+        self.assertEqual(profiles["hypixel"]["socials"]["Discord"], "notch#0001")
+        self.assertEqual(profiles["leonemc"]["games"]["SkyWars"], {"Wins": "33", "Kills": "410"})
+        self.assertEqual(profiles["mcbrawl"]["games"]["Survival Games"]["classes"]["Archer"], {"Kills": "9"})
+        self.assertEqual(profiles["namemc"]["information"][0], "Creator of Minecraft & founder of Mojang")
+        self.assertEqual([n["name"] for n in profiles["namemc"]["name_history"]], ["Notch", "Notch_"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+import asyncio
+import re
+import time
+import unittest
+
+from core.cache import ResultCache
+from core.engine import FetchEngine
+from core.executor import BoundedExecutor
+from core.search import SearchPipeline
+from functions.errors import NotFound, ParseError
+
+
+UUID = "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+
+
+class _Mojang:
+    UUID_RE = re.compile(r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$")
+    NAME_RE = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+    def __init__(self, players: dict | None = None):
+        self.players = players if players is not None else {"notch": (UUID, "Notch")}
+        self.remembered = []
+
+    def is_uuid(self, text: str) -> bool:
+        return bool(self.UUID_RE.match(text))
+
+    def remember(self, uuid, username):
+        self.remembered.append((uuid, username))
+
+    def resolve_both(self, identifier: str):
+        found = self.players.get(identifier.lower())
+        if found is None:
+            raise LookupError(identifier)
+        return found
+
+    def resolve_bedrock(self, gamertag: str):
+        return None
+
+
+class _Client:
+    """Fake source returning ``results`` in turn (the last one repeats)."""
+
+    def __init__(self, *results, delay: float = 0):
+        self.results = results
+        self.delay = delay
+        self.calls = []
+
+    async def get_profile_async(self, identifier: str):
+        self.calls.append(identifier)
+        await asyncio.sleep(self.delay)
+        result = self.results[min(len(self.calls), len(self.results)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _pipeline(clients: dict, mojang=None, **kwargs) -> SearchPipeline:
+    return SearchPipeline(
+        FetchEngine(BoundedExecutor(max_workers=4)),
+        mojang or _Mojang(),
+        clients,
+        **kwargs,
+    )
+
+
+def _collect(agen) -> list:
+    async def run():
+        return [event async for event in agen]
+    return asyncio.run(run())
+
+
+def _sources(events: list) -> dict:
+    return {e["label"]: e for e in events if e["type"] == "source"}
+
+
+class SpeculativeTest(unittest.TestCase):
+
+    def _search(self, identifier: str, players: dict) -> _Client:
+        client = _Client({"rank": 1})
+        pipeline = _pipeline({"src": (client, "username")}, _Mojang(players))
+        _collect(pipeline.search(identifier))
+        return client
+
+    def test_reuses_the_fetch_for_a_confirmed_name(self):
+        for identifier in ("Notch", "NOTCH"):
+            players = {"notch": (UUID, "Notch")}
+            self.assertEqual(self._search(identifier, players).calls, [identifier])
+
+    def test_refetches_when_the_name_differs(self):
+        client = self._search("Notch", {"notch": (UUID, "Jeb_")})
+        self.assertEqual(client.calls, ["Notch", "Jeb_"])
+
+    def test_only_valid_names_start_early(self):
+        for identifier in (UUID, "Steve Bedrock", "a" * 17):
+            players = {identifier.lower(): (UUID, "Notch")}
+            self.assertEqual(self._search(identifier, players).calls, ["Notch"])
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def _clients(self) -> dict:
+        return {
+            "fast": (_Client({"rank": 1}), "username"),
+            "quick": (_Client({"rank": 2}, delay=0.05), "username"),
+            "slow": (_Client({"rank": 3}, delay=5), "username"),
+        }
+
+    def test_deadline(self):
+        pipeline = _pipeline(self._clients(), deadline=0.3, speculative=False)
+        sources = _sources(_collect(pipeline.search("Notch")))
+        self.assertEqual(sources["fast"]["status"], "ok")
+        self.assertEqual(sources["quick"]["status"], "ok")
+        self.assertEqual((sources["slow"]["status"], sources["slow"]["error"]), ("timeout", "Timed out"))
+
+    def test_quorum(self):
+        pipeline = _pipeline(self._clients(), speculative=False)
+        started = time.monotonic()
+        events = _collect(pipeline.search("Notch", quorum=2))
+        self.assertLess(time.monotonic() - started, 1)
+        sources = _sources(events)
+        self.assertEqual(sources["quick"]["status"], "ok")
+        self.assertEqual(sources["slow"]["status"], "cancelled")
+        self.assertEqual([e["fetched"] for e in events if e["type"] == "source"], [1, 2, 3])
+
+    def test_failures_do_not_count_towards_quorum(self):
+        clients = self._clients()
+        clients["fast"] = (_Client(ParseError("Unrecognised page")), "username")
+        pipeline = _pipeline(clients, deadline=0.3, speculative=False)
+        sources = _sources(_collect(pipeline.search("Notch", quorum=2)))
+        self.assertEqual(sources["slow"]["status"], "timeout")
+
+    def test_invalid_quorum(self):
+        pipeline = _pipeline(self._clients(), speculative=False)
+        for quorum in (0, -1):
+            with self.assertRaises(ValueError):
+                _collect(pipeline.search("Notch", quorum=quorum))
+
+
+class StaleWhileRevalidateTest(unittest.TestCase):
+
+    def _stale_cache(self) -> ResultCache:
+        cache = ResultCache(stale_ttl=60)
+        cache.put("stale", "Notch", {"rank": 1}, ttl=0.01)
+        time.sleep(0.02)
+        return cache
+
+    def test_update_after_another_source_timed_out(self):
+        refreshed = _Client({"rank": 2}, delay=0.4)
+        pipeline = _pipeline(
+            {
+                "stale": (refreshed, "username"),
+                "slow": (_Client({}, delay=5), "username"),
+            },
+            cache=self._stale_cache(),
+            deadline=0.3,
+            speculative=False,
+        )
+        events = _collect(pipeline.search("Notch"))
+
+        sources = _sources(events)
+        self.assertEqual(sources["stale"]["status"], "stale")
+        self.assertEqual(sources["stale"]["data"], {"rank": 1})
+        self.assertEqual(sources["slow"]["status"], "timeout")
+        updates = [e for e in events if e["type"] == "update"]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0]["data"], {"rank": 2})
+        self.assertEqual(events[-1]["type"], "refreshed")
+
+    def test_unchanged_refresh_sends_no_update(self):
+        pipeline = _pipeline(
+            {"stale": (_Client({"rank": 1}), "username")},
+            cache=self._stale_cache(),
+            speculative=False,
+        )
+        events = _collect(pipeline.search("Notch"))
+        self.assertEqual([e["type"] for e in events], ["player", "source", "done", "refreshed"])
+
+
+class BulkTest(unittest.TestCase):
+
+    PLAYERS = {"notch": (UUID, "Notch"), "jeb_": ("853c80ef-3c37-49fd-aa49-938b674adae6", "jeb_")}
+
+    def test_merges_player_streams(self):
+        pipeline = _pipeline({"src": (_Client({"rank": 1}), "username")}, _Mojang(self.PLAYERS))
+        events = _collect(pipeline.bulk(["Notch", "jeb_", "nobody"], concurrency=2))
+        self.assertEqual(events[-1], {"type": "done", "players": 3})
+        by_query = {}
+        for event in events[:-1]:
+            by_query.setdefault(event["query"], []).append(event["type"])
+        self.assertEqual(by_query, {
+            "Notch": ["player", "source"],
+            "jeb_": ["player", "source"],
+            "nobody": ["error"],
+        })
+
+    def test_stale_refreshes_do_not_hold_slots(self):
+        cache = ResultCache(stale_ttl=60)
+        for name in ("Notch", "jeb_"):
+            cache.put("src", name, {"rank": 1}, ttl=0.01)
+        time.sleep(0.02)
+        client = _Client({"rank": 2}, delay=5)
+        pipeline = _pipeline({"src": (client, "username")}, _Mojang(self.PLAYERS), cache=cache)
+
+        started = time.monotonic()
+        events = _collect(pipeline.bulk(["Notch", "jeb_"], concurrency=1))
+        self.assertLess(time.monotonic() - started, 1)
+        statuses = [e["status"] for e in events if e["type"] == "source"]
+        self.assertEqual(statuses, ["stale", "stale"])
+        self.assertNotIn("update", [e["type"] for e in events])
+
+
+class NotFoundCachingTest(unittest.TestCase):
+
+    def test_not_found_is_cached(self):
+        client = _Client(NotFound("Player not found"))
+        pipeline = _pipeline(
+            {"src": (client, "username")},
+            cache=ResultCache(not_found_ttl=60),
+            speculative=False,
+        )
+        for _ in range(2):
+            source = _sources(_collect(pipeline.search("Notch")))["src"]
+            self.assertEqual(source["status"], "not_found")
+            self.assertEqual(source["error"], "Player not found")
+        self.assertEqual(len(client.calls), 1)
+
+    def test_other_failures_are_not_cached(self):
+        for error in (ParseError("Unrecognised page"), ValueError("bad payload")):
+            client = _Client(error, {"rank": 1})
+            pipeline = _pipeline(
+                {"src": (client, "username")},
+                cache=ResultCache(not_found_ttl=60),
+                speculative=False,
+            )
+            first = _sources(_collect(pipeline.search("Notch")))["src"]
+            second = _sources(_collect(pipeline.search("Notch")))["src"]
+            self.assertEqual(first["status"], "parse_error")
+            self.assertEqual((second["status"], second["data"]), ("ok", {"rank": 1}))
+
+
+class IdentityTest(unittest.TestCase):
+
+    def _search(self, data: dict) -> list:
+        mojang = _Mojang()
+        pipeline = _pipeline(
+            {"src": (_Client(data), "username")},
+            mojang,
+            identity_sources=("src",),
+            speculative=False,
+        )
+        _collect(pipeline.search("Notch"))
+        return mojang.remembered
+
+    def test_remembers_the_resolved_player(self):
+        remembered = self._search({"uuid": UUID.replace("-", "").upper(), "username": "Notch"})
+        self.assertEqual(remembered, [(UUID, "Notch")])
+
+    def test_ignores_another_player(self):
+        other = "853c80ef-3c37-49fd-aa49-938b674adae6"
+        self.assertEqual(self._search({"uuid": other, "username": "Notch"}), [])
+        self.assertEqual(self._search({"username": "Notch"}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
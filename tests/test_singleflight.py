@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from core.singleflight import SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_coalesces_concurrent_calls(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flights.do("k", load) for _ in range(5)))
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.snapshot()["coalesced"], 4)
+        self.assertEqual(flights.snapshot()["inflight"], 0)
+
+    async def test_errors_reach_every_waiter(self):
+        flights = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flights.do("k", load), flights.do("k", load), return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_cancelling_one_waiter_keeps_the_flight(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(flights.do("k", load))
+        second = asyncio.ensure_future(flights.do("k", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await second, "value")
+        self.assertEqual(flights.snapshot()["abandoned"], 0)
+
+    async def test_unstarted_flight_is_abandoned(self):
+        flights = SingleFlight()
+        ran = asyncio.Event()
+
+        async def load():
+            await asyncio.sleep(0.05)
+            ran.set()
+
+        waiter = asyncio.ensure_future(flights.do("k", load))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.1)
+        self.assertFalse(ran.is_set())
+        self.assertEqual(flights.snapshot()["abandoned"], 1)
+        self.assertEqual(flights.snapshot()["inflight"], 0)
+
+    async def test_started_flight_is_orphaned_and_finishes(self):
+        flights = SingleFlight()
+        ran = asyncio.Event()
+
+        async def load():
+            flights.mark_started("k")
+            await asyncio.sleep(0.05)
+            ran.set()
+
+        waiter = asyncio.ensure_future(flights.do("k", load))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.1)
+        self.assertTrue(ran.is_set())
+        self.assertEqual(flights.snapshot()["orphaned"], 1)
+        self.assertEqual(flights.snapshot()["abandoned"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
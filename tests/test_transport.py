@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from functions.errors import Blocked, NotFound, SourceError, TransientError
+from functions.hive import HiveClient
+from functions.transport import AsyncSession, ResponseTooLarge, check_status, make_session, read_text
+
+
+PAGE = b"<html><body>" + b"x" * 200_000 + b"<footer></footer></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.startswith("/moved/"):
+            self.send_response(302)
+            self.send_header("Location", "/players/" + self.path[len("/moved/"):])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/players/nobody":
+            self._send(404, b"no such player")
+        elif self.path == "/page":
+            self._send(200, PAGE, "text/html; charset=utf-8")
+        elif self.path == "/missing":
+            self._send(404, PAGE, "text/html")
+        elif self.path == "/unsized":
+            # No Content-Length: HTTP/1.0 ends the body by closing.
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            self.wfile.write(PAGE)
+        elif self.path.startswith("/players/"):
+            body = json.dumps({"name": self.path[len("/players/"):]}).encode()
+            self._send(200, body, "application/json")
+        else:
+            self._send(500, b"")
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/plain"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+
+class AsyncSessionTest(_ServerTest):
+
+    def test_follows_redirects(self):
+        async def get():
+            resp = await AsyncSession().get(f"{self.url}/moved/notch", timeout=5)
+            return resp.status_code, resp.json()
+
+        self.assertEqual(asyncio.run(get()), (200, {"name": "notch"}))
+
+    def test_response_hooks(self):
+        session = AsyncSession()
+        seen = []
+        session.hooks["response"].append(lambda resp: seen.append(resp.status_code))
+        asyncio.run(session.get(f"{self.url}/players/notch", timeout=5))
+        self.assertEqual(seen, [200])
+
+    def test_counts_bytes(self):
+        session = AsyncSession()
+        seen = []
+        session.on_bytes.append(seen.append)
+        asyncio.run(session.get(f"{self.url}/players/notch", timeout=5))
+        self.assertEqual(seen, [len(b'{"name": "notch"}')])
+
+    def test_sync_get_profile(self):
+        client = HiveClient(timeout=5)
+        client.BASE_URL = f"{self.url}/moved"
+        self.assertEqual(client.get_profile("notch"), {"name": "notch"})
+        self.assertEqual(client.get_profile("jeb_"), {"name": "jeb_"})
+        with self.assertRaises(NotFound):
+            client.get_profile("nobody")
+
+
+class ReadTextTest(_ServerTest):
+
+    def setUp(self):
+        self.session = make_session()
+        self.received = []
+        self.session.on_bytes.append(self.received.append)
+
+    def test_reads_the_body(self):
+        for path in ("/page", "/unsized"):
+            self.received.clear()
+            resp, text = read_text(self.session, self.url + path, 5)
+            self.assertEqual((resp.status_code, text), (200, PAGE.decode()))
+            self.assertEqual(self.received, [len(PAGE)])
+
+    def test_stops_once_matched(self):
+        _, text = read_text(self.session, self.url + "/page", 5, until=lambda text: "x" in text)
+        self.assertLess(len(text), len(PAGE))
+        self.assertEqual(self.received, [len(text.encode())])
+
+    def test_status_checked_before_the_body(self):
+        with self.assertRaises(NotFound):
+            read_text(self.session, self.url + "/missing", 5, not_found="missing", max_bytes=1024)
+        with self.assertRaises(SourceError):
+            read_text(self.session, self.url + "/missing", 5, max_bytes=1024)
+        self.assertEqual(self.received, [0, 0])
+
+    def test_too_large(self):
+        with self.assertRaises(ResponseTooLarge):
+            read_text(self.session, self.url + "/unsized", 5, max_bytes=1024)
+
+    def test_unstreamed_responses(self):
+        self.session.get(self.url + "/unsized", timeout=5)
+        self.assertEqual(self.received, [len(PAGE)])
+
+
+class _Status:
+
+    def __init__(self, status_code: int, headers: dict | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class CheckStatusTest(unittest.TestCase):
+
+    def test_success(self):
+        check_status(_Status(200))
+        check_status(_Status(204), "missing")
+
+    def test_not_found_only_when_asked(self):
+        with self.assertRaises(NotFound) as caught:
+            check_status(_Status(404), "No such player")
+        self.assertEqual(str(caught.exception), "No such player")
+        with self.assertRaises(SourceError) as caught:
+            check_status(_Status(404))
+        self.assertNotIsInstance(caught.exception, NotFound)
+
+    def test_typed_failures(self):
+        for status, error in ((401, Blocked), (403, Blocked), (429, Blocked),
+                              (408, TransientError), (500, TransientError), (503, TransientError)):
+            with self.assertRaises(error):
+                check_status(_Status(status), "missing")
+
+    def test_bot_check(self):
+        with self.assertRaises(Blocked):
+            check_status(_Status(200, {"cf-mitigated": "challenge"}))
+
+
+if __name__ == "__main__":
+    unittest.main()